@@ -1,5 +1,7 @@
 # app.py
+import uuid
 import streamlit as st
+from langgraph.types import Command
 from config import settings
 from orchestration.workflow import workflow
 from orchestration.schema import WorkflowState
@@ -15,6 +17,51 @@ from utils.streamlit_helpers import (
     display_trending_topics
 )
 
+def run_workflow(workflow_input):
+    """
+    Stream the workflow for the current run until it finishes or pauses for review
+
+    Args:
+        workflow_input: Initial WorkflowState for a new run, or a Command resuming a paused one
+    """
+    config = {"configurable": {"thread_id": st.session_state.thread_id}}
+    
+    # Progress bar
+    progress_bar = st.progress(0)
+    status_container = st.empty()
+    
+    try:
+        steps_total = 8  # Approximate number of steps in the workflow
+        step_count = 0
+        
+        for step_output in workflow.stream(workflow_input, config):
+            # A review checkpoint called interrupt(): the run is saved and waits for Continue
+            if "__interrupt__" in step_output:
+                pause = step_output["__interrupt__"][0].value
+                st.session_state.is_paused = True
+                st.session_state.pause_reason = pause["pause_reason"]
+                status_container.info(pause["status_message"])
+                break
+            
+            # Update progress bar
+            step_count += 1
+            progress_percentage = min(step_count / steps_total, 1.0)
+            progress_bar.progress(progress_percentage)
+            
+            for node_name, update in step_output.items():
+                if isinstance(update, dict) and update.get("status_message"):
+                    status_container.info(update["status_message"])
+                else:
+                    status_container.info(f"Processing: {node_name}")
+        
+        # The checkpointer holds the full state of the run
+        st.session_state.workflow_state = WorkflowState(**workflow.get_state(config).values)
+        
+    except Exception as e:
+        st.error(f"Error in workflow execution: {str(e)}")
+    
+    st.session_state.is_running = st.session_state.is_paused
+
 def main():
     """Main Streamlit application"""
     # Page configuration
@@ -92,6 +139,12 @@ def main():
             review_video = st.checkbox("Review Final Video", value=True,
                                        help="Pause after video assembly to review before upload")
         
+        # Output quality
+        profile_names = list(settings.RENDER_PROFILES)
+        render_profile = st.selectbox("Render Profile", profile_names,
+                                      index=profile_names.index(settings.RENDER_PROFILE) if settings.RENDER_PROFILE in profile_names else 0,
+                                      help="draft renders quickly at low resolution, review is a 720p copy, final is sized for upload, archive is a low-bitrate copy")
+        
         # Submit button
         submit_button = st.form_submit_button("Generate Video", 
                                              use_container_width=True,
@@ -111,70 +164,22 @@ def main():
             "review_video": review_video
         }
         
-        # Execute workflow in the main thread (no separate thread)
+        # Each run is a checkpointed thread that can be paused and resumed
+        st.session_state.thread_id = str(uuid.uuid4())
+        st.session_state.review_edits = {}
+        st.session_state.is_paused = False
+        st.session_state.pause_reason = ""
         st.session_state.is_running = True
         
         # Initialize state
-        initial_state = WorkflowState(topic=topic)
+        initial_state = WorkflowState(topic=topic, render_profile=render_profile, pause_checkpoints=pause_checkpoints)
+        st.info(f"Starting workflow for topic: {topic}")
         
-        # Progress bar
-        progress_bar = st.progress(0)
-        status_container = st.empty()
-        status_container.info(f"Starting workflow for topic: {topic}")
+        run_workflow(initial_state)
         
-        # Execute workflow step by step
-        try:
-            steps_total = 8  # Approximate number of steps in the workflow
-            step_count = 0
-            
-            for step_output in workflow.stream(initial_state):
-                # Update session state with current workflow state
-                st.session_state.workflow_state = step_output
-                # Update progress bar
-                step_count += 1
-                progress_percentage = min(step_count / steps_total, 1.0)
-                progress_bar.progress(progress_percentage)
-
-                if st.session_state.workflow_state:
-                    keys = list(st.session_state.workflow_state.keys())
-                    if keys:
-                        first_key = keys[0]
-                        if isinstance(st.session_state.workflow_state[first_key], dict) and 'status_message' in st.session_state.workflow_state[first_key]:
-                            status_container.info(st.session_state.workflow_state[first_key]['status_message'])
-                        else:
-                            status_container.info(f"Processing: {first_key}")
-                    else:
-                        status_container.info("Processing workflow...")
-                # Check if we should pause at this point
-                current_node = step_output.get("__metadata__", {}).get("current_node", "")
-                
-                if current_node == "check_pause_news" and pause_checkpoints.get("review_news", False):
-                    st.session_state.is_paused = True
-                    st.session_state.pause_reason = "review_news"
-                    break
-                
-                elif current_node == "check_pause_script" and pause_checkpoints.get("review_script", False):
-                    st.session_state.is_paused = True
-                    st.session_state.pause_reason = "review_script"
-                    break
-                
-                elif current_node == "check_pause_media" and pause_checkpoints.get("review_media", False):
-                    st.session_state.is_paused = True
-                    st.session_state.pause_reason = "review_media"
-                    break
-                
-                elif current_node == "check_pause_video" and pause_checkpoints.get("review_video", False):
-                    st.session_state.is_paused = True
-                    st.session_state.pause_reason = "review_video"
-                    break
-                
-            # If paused, show the appropriate review screen
-            if st.session_state.is_paused:
-                st.rerun()
-            
-        except Exception as e:
-            st.error(f"Error in workflow execution: {str(e)}")
-            st.session_state.is_running = False
+        # If paused, show the appropriate review screen
+        if st.session_state.is_paused:
+            st.rerun()
     
     # Display workflow status and results
     state = st.session_state.workflow_state
@@ -193,22 +198,19 @@ def main():
             elif st.session_state.pause_reason == "review_media" and (state.audio_path or state.image_paths):
                 display_media_review(state.audio_path, state.image_paths)
             
-            elif st.session_state.pause_reason == "review_video" and state.video_path:
-                display_video_review(state.video_path)
+            elif st.session_state.pause_reason == "review_video" and (state.preview_path or state.video_path):
+                display_video_review(state.preview_path or state.video_path)
             
             # Continue button
             if st.button("Continue Processing", type="primary", use_container_width=True):
                 st.session_state.is_paused = False
                 st.session_state.pause_reason = ""
                 
-                # Continue the workflow
-                initial_state = WorkflowState(**state.dict())
-                
-                st.session_state.is_running = True
+                # Resume from the checkpoint with the reviewer's edits; finished stages are not rerun
+                edits = st.session_state.review_edits
+                st.session_state.review_edits = {}
+                run_workflow(Command(resume=edits))
                 st.rerun()
-        
-       
-            
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -37,15 +37,118 @@ class Settings:
     IMAGES_DIR = os.path.join(OUTPUT_DIR, "images")
     VIDEOS_DIR = os.path.join(OUTPUT_DIR, "videos")
     TEMP_DIR = os.path.join(OUTPUT_DIR, "temp")
+    TTS_CACHE_DIR = os.path.join(OUTPUT_DIR, "tts_cache")
+    SEGMENT_CACHE_DIR = os.path.join(OUTPUT_DIR, "segment_cache")
+    AUDIO_CACHE_DIR = os.path.join(OUTPUT_DIR, "audio_cache")
+    BUMPER_CACHE_DIR = os.path.join(OUTPUT_DIR, "bumper_cache")
+    UPLOAD_SESSION_DIR = os.path.join(OUTPUT_DIR, "upload_sessions")
+    UPLOAD_QUEUE_PATH = os.path.join(OUTPUT_DIR, "upload_queue.db")
+    WORKFLOW_CHECKPOINT_PATH = os.path.join(OUTPUT_DIR, "workflow_checkpoints.db")
+    BLOB_STORE_DIR = os.path.join(OUTPUT_DIR, "blobs")  # Articles, summaries, scripts and prompts referenced from workflow state
+    RUN_MANIFEST_DIR = os.path.join(OUTPUT_DIR, "runs")  # Per-run record of stage outputs reused by later runs
     
     # Assets
     BG_MUSIC_PATH = os.getenv("BG_MUSIC_PATH", "assets/bg_music.mp3")
     PLACEHOLDER_IMAGE_PATH = os.getenv("PLACEHOLDER_IMAGE_PATH", "assets/placeholder.jpg")
+    INTRO_BUMPER_PATH = os.getenv("INTRO_BUMPER_PATH", "assets/intro.mp4")  # Skipped when the file does not exist
+    OUTRO_BUMPER_PATH = os.getenv("OUTRO_BUMPER_PATH", "assets/outro.mp4")
+    BUMPER_IMAGE_SECONDS = float(os.getenv("BUMPER_IMAGE_SECONDS", "2"))  # How long a still-image bumper is shown
+    
+    # YouTube upload
+    YOUTUBE_UPLOAD_CHUNK_MB = int(os.getenv("YOUTUBE_UPLOAD_CHUNK_MB", "8"))  # Bytes per request; a dropped connection resends at most one chunk
+    YOUTUBE_UPLOAD_MAX_RETRIES = int(os.getenv("YOUTUBE_UPLOAD_MAX_RETRIES", "10"))
+    UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "2"))
+    UPLOAD_MAX_ATTEMPTS = int(os.getenv("UPLOAD_MAX_ATTEMPTS", "5"))
+    UPLOAD_LEASE_SECONDS = float(os.getenv("UPLOAD_LEASE_SECONDS", "120"))  # A job whose worker stops renewing its lease this long is resumed elsewhere
+    YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))  # API units per day
+    YOUTUBE_INSERT_QUOTA_COST = int(os.getenv("YOUTUBE_INSERT_QUOTA_COST", "1600"))  # Units charged per videos.insert
+    YOUTUBE_DISCOVERY_PATH = os.getenv("YOUTUBE_DISCOVERY_PATH", "")  # Local discovery document; empty uses the one bundled with the client library
+    YOUTUBE_API_ENDPOINT = os.getenv("YOUTUBE_API_ENDPOINT", "")  # Override the API root, e.g. a local stand-in server for tests
+    
+    # Text-to-speech
+    TTS_MAX_WORKERS = int(os.getenv("TTS_MAX_WORKERS", "4"))
+    TTS_AUDIO_FORMAT = os.getenv("TTS_AUDIO_FORMAT", "wav")  # "wav" (LINEAR16, no decode in the renderer) or "mp3"
+    
+    # Audio mix (music bed ducked under the narration)
+    AUDIO_BED_VOLUME = float(os.getenv("AUDIO_BED_VOLUME", "0.12"))  # Music gain in pauses; the timeline's bg_volume applies under speech
+    AUDIO_DUCK_THRESHOLD_DB = float(os.getenv("AUDIO_DUCK_THRESHOLD_DB", "-40"))  # Narration level treated as speech
+    AUDIO_DUCK_RELEASE = float(os.getenv("AUDIO_DUCK_RELEASE", "0.4"))  # Seconds the duck holds after speech stops
+    
+    # Narration length (checked before any TTS, image or render work)
+    NARRATION_MAX_SECONDS = float(os.getenv("NARRATION_MAX_SECONDS", "45"))
+    NARRATION_OVERLENGTH_ACTION = os.getenv("NARRATION_OVERLENGTH_ACTION", "trim")  # "trim" or "flag"
+    DURATION_CALIBRATION_PATH = os.path.join(OUTPUT_DIR, "duration_calibration.json")
+    
+    # Video rendering
+    VIDEO_RENDER_BACKEND = os.getenv("VIDEO_RENDER_BACKEND", "moviepy")  # "moviepy", "ffmpeg" (single filter-graph pass) or "segments" (parallel) or "stream" (frame pipe)
+    VIDEO_RENDER_WORKERS = int(os.getenv("VIDEO_RENDER_WORKERS", str(os.cpu_count() or 1)))
+    VIDEO_MOTION_RENDERER = os.getenv("VIDEO_MOTION_RENDERER", "numpy")  # "numpy" (MotionRenderer) or "moviepy" (legacy lambdas)
+    SEGMENT_CACHE_MAX_MB = int(os.getenv("SEGMENT_CACHE_MAX_MB", "2048"))  # Encoded segments reused by the "segments" backend
+    
+    # Review preview: a quick render for the video checkpoint while the final render is deferred
+    PREVIEW_RENDER_PROFILE = os.getenv("PREVIEW_RENDER_PROFILE", "draft")
+    FINAL_RENDER_START = os.getenv("FINAL_RENDER_START", "background")  # "background" (during review) or "approval" (after Continue)
+    
+    # Render profiles (output geometry and encoder settings, selectable per run);
+    # set video_bitrate (e.g. "2500k") to use a capped bitrate instead of crf
+    RENDER_PROFILE = os.getenv("RENDER_PROFILE", "final")
+    RENDER_PROFILES = {
+        # Quick low-resolution render for reviewing a video before it is finalised
+        "draft": {"frame_size": (540, 960), "fps": 24, "preset": "ultrafast", "crf": 30, "video_bitrate": None,
+                  "tune": "stillimage", "threads": 0, "audio_bitrate": "96k"},
+        # 720p copy for the review UI
+        "review": {"frame_size": (720, 1280), "fps": 30, "preset": "veryfast", "crf": 26, "video_bitrate": None,
+                   "tune": "stillimage", "threads": 0, "audio_bitrate": "96k"},
+        # Shorts upload: full 1080x1920 frame, sized for a fast upload
+        "final": {"frame_size": (1080, 1920), "fps": 30, "preset": "medium", "crf": 23, "video_bitrate": None,
+                  "tune": "stillimage", "threads": 0, "audio_bitrate": "128k"},
+        # Low-bitrate copy for long-term storage
+        "archive": {"frame_size": (1080, 1920), "fps": 30, "preset": "slow", "crf": None, "video_bitrate": "1200k",
+                    "tune": "stillimage", "threads": 0, "audio_bitrate": "96k"},
+    }
+    # Extra profiles rendered alongside the main one from the same frames, e.g. "review,archive"
+    RENDITIONS = [name.strip() for name in os.getenv("RENDITIONS", "").split(",") if name.strip()]
+    
+    # Captions (burned in from the narration's word timings)
+    CAPTIONS_ENABLED = os.getenv("CAPTIONS_ENABLED", "true").lower() == "true"
+    CAPTION_FONT_PATH = os.getenv("CAPTION_FONT_PATH", "DejaVuSans-Bold.ttf")
+    CAPTION_FONT_SCALE = float(os.getenv("CAPTION_FONT_SCALE", "0.045"))  # Font size as a fraction of the frame height
+    CAPTION_MAX_WORDS = int(os.getenv("CAPTION_MAX_WORDS", "3"))
+    CAPTION_POSITION = float(os.getenv("CAPTION_POSITION", "0.72"))  # Top of the caption band as a fraction of the frame height
+    
+    # Image count (one shot per IMAGE_SECONDS_PER_SHOT of predicted narration)
+    IMAGE_SECONDS_PER_SHOT = float(os.getenv("IMAGE_SECONDS_PER_SHOT", "4.5"))
+    IMAGE_MIN_COUNT = int(os.getenv("IMAGE_MIN_COUNT", "3"))
+    IMAGE_MAX_COUNT = int(os.getenv("IMAGE_MAX_COUNT", "12"))
+    
+    # Image sources
+    IMAGE_SOURCE = os.getenv("IMAGE_SOURCE", "pollinations")  # "pollinations" or "title_card" (offline/benchmark)
+    IMAGE_FALLBACK = os.getenv("IMAGE_FALLBACK", "title_card")  # "title_card" or "placeholder"
+    IMAGE_FALLBACK_DEADLINE = float(os.getenv("IMAGE_FALLBACK_DEADLINE", "15"))  # Seconds per image before falling back
+    TITLE_CARD_FONT_PATH = os.getenv("TITLE_CARD_FONT_PATH", "DejaVuSans-Bold.ttf")
+    
+    # Image deduplication (perceptual hash)
+    IMAGE_HASH_CACHE_PATH = os.path.join(TEMP_DIR, "image_hashes.json")
+    IMAGE_DEDUP_THRESHOLD = int(os.getenv("IMAGE_DEDUP_THRESHOLD", "6"))  # Max differing bits out of 64
+    IMAGE_DEDUP_MAX_ROUNDS = int(os.getenv("IMAGE_DEDUP_MAX_ROUNDS", "2"))
+    
+    # Headless batch runner (run_supervisor.py)
+    BATCH_QUEUE_SIZE = int(os.getenv("BATCH_QUEUE_SIZE", "2"))  # Topics allowed to wait between two stages
+    BATCH_STAGE_WORKERS = {  # Topics each stage works on at once
+        name.strip(): int(count)
+        for name, count in (item.split("=") for item in os.getenv(
+            "BATCH_STAGE_WORKERS", "news=2,script=2,media=2,render=1,upload=1").split(",") if item.strip())
+    }
+    BATCH_UPLOAD_WAIT = float(os.getenv("BATCH_UPLOAD_WAIT", "3600"))  # Seconds a batch waits for its uploads before exiting
+    
+    # Stage memoisation (reruns of a topic reuse news, script, media and render outputs whose inputs are unchanged)
+    STAGE_MEMO_ENABLED = os.getenv("STAGE_MEMO_ENABLED", "true").lower() == "true"
+    STAGE_MEMO_MAX_AGE_HOURS = float(os.getenv("STAGE_MEMO_MAX_AGE_HOURS", "24"))  # Older outputs are recomputed, so news stays current
     
     # Ensure directories exist
     @classmethod
     def ensure_directories(cls):
-        for directory in [cls.OUTPUT_DIR, cls.AUDIO_DIR, cls.IMAGES_DIR, cls.VIDEOS_DIR, cls.TEMP_DIR]:
+        for directory in [cls.OUTPUT_DIR, cls.AUDIO_DIR, cls.IMAGES_DIR, cls.VIDEOS_DIR, cls.TEMP_DIR, cls.TTS_CACHE_DIR, cls.SEGMENT_CACHE_DIR, cls.AUDIO_CACHE_DIR, cls.BUMPER_CACHE_DIR, cls.UPLOAD_SESSION_DIR, cls.BLOB_STORE_DIR, cls.RUN_MANIFEST_DIR]:
             os.makedirs(directory, exist_ok=True)
 
 # Create a settings instance
@@ -0,0 +1,208 @@
+# orchestration/memo.py
+import os
+import re
+import json
+import time
+import hashlib
+import importlib.util
+import threading
+from config import settings
+from utils.logger import Logger
+from utils.blob_store import blob_store
+
+# Stages that can be recomputed with --from-stage, in workflow order
+STAGE_ORDER = ["news", "script", "media", "render"]
+
+# Memoised nodes: stage, state fields the node reads, settings that change its output and
+# the modules doing its work. Run `python -m orchestration.memo` after changing any of those
+# modules: it fails if one of them reads a setting the node's list is missing.
+MEMO_NODES = {
+    "fetch_and_consolidate_news": ("news", ["topic"], [],
+                                   ["orchestration.nodes.news_nodes", "services.news_scraper"]),
+    "generate_script_and_prompts": ("script", ["consolidated_news_ref"],
+                                    ["NARRATION_MAX_SECONDS", "NARRATION_OVERLENGTH_ACTION",
+                                     "IMAGE_SECONDS_PER_SHOT", "IMAGE_MIN_COUNT", "IMAGE_MAX_COUNT"],
+                                    ["orchestration.nodes.script_nodes", "services.script_generator",
+                                     "services.duration_estimator"]),
+    "generate_audio": ("media", ["narration", "emotion"], ["TTS_AUDIO_FORMAT"],
+                       ["orchestration.nodes.media_nodes", "services.tts_service"]),
+    "generate_images": ("media", ["image_prompts_ref", "title", "narration", "render_profile"],
+                        ["IMAGE_SOURCE", "IMAGE_FALLBACK", "IMAGE_FALLBACK_DEADLINE", "IMAGE_DEDUP_THRESHOLD",
+                         "IMAGE_DEDUP_MAX_ROUNDS", "PLACEHOLDER_IMAGE_PATH", "TITLE_CARD_FONT_PATH",
+                         "RENDER_PROFILE", "RENDER_PROFILES"],
+                        ["orchestration.nodes.media_nodes", "services.image_generator", "services.image_hasher",
+                         "services.title_card_generator", "utils.ffmpeg"]),
+    "assemble_video": ("render", ["audio_path", "audio_duration", "image_paths", "sentence_timepoints",
+                                  "word_timepoints", "emotion", "render_profile", "render_seed", "pause_checkpoints"],
+                       ["VIDEO_RENDER_BACKEND", "VIDEO_MOTION_RENDERER", "RENDER_PROFILE", "RENDER_PROFILES",
+                        "RENDITIONS", "PREVIEW_RENDER_PROFILE", "BG_MUSIC_PATH", "AUDIO_BED_VOLUME",
+                        "AUDIO_DUCK_THRESHOLD_DB", "AUDIO_DUCK_RELEASE", "CAPTIONS_ENABLED", "CAPTION_FONT_PATH",
+                        "CAPTION_FONT_SCALE", "CAPTION_MAX_WORDS", "CAPTION_POSITION", "INTRO_BUMPER_PATH",
+                        "OUTRO_BUMPER_PATH", "BUMPER_IMAGE_SECONDS"],
+                       ["orchestration.nodes.video_nodes", "services.video_editor", "services.audio_mixer",
+                        "services.caption_renderer", "services.motion_renderer", "services.bumper_cache",
+                        "services.ffmpeg_renderer", "services.segment_renderer", "services.frame_writer",
+                        "utils.ffmpeg"]),
+}
+
+# Settings that only say where files live, how much runs at once or how to authenticate,
+# and so never change what a node produces
+UNKEYED_SETTINGS = {
+    "TEMP_DIR", "AUDIO_DIR", "IMAGES_DIR", "VIDEOS_DIR", "BLOB_STORE_DIR",
+    "AUDIO_CACHE_DIR", "BUMPER_CACHE_DIR", "SEGMENT_CACHE_DIR", "SEGMENT_CACHE_MAX_MB", "TTS_CACHE_DIR",
+    "IMAGE_HASH_CACHE_PATH", "DURATION_CALIBRATION_PATH",
+    "TTS_MAX_WORKERS", "VIDEO_RENDER_WORKERS", "FINAL_RENDER_START",
+    "GROQ_API_KEY", "EVENT_REGISTRY_API_KEY", "GOOGLE_CLOUD_SERVICE_ACCOUNT_PATH",
+}
+
+def unlisted_settings():
+    """
+    Settings read by a memoised node's modules but missing from its MEMO_NODES list
+
+    Reads the modules' source files without importing them, so it is a development check
+    rather than something the workflow relies on at run time.
+
+    Returns:
+        dict: Node name -> sorted setting names that should be added to its list (empty when all are listed)
+    """
+    pattern = re.compile(r"\bsettings\.([A-Z][A-Z0-9_]*)")
+    missing = {}
+    for name, (_, _, setting_names, modules) in MEMO_NODES.items():
+        read = set()
+        for module in modules:
+            with open(importlib.util.find_spec(module).origin, "r", encoding="utf-8") as f:
+                read.update(pattern.findall(f.read()))
+        unlisted = sorted(read - set(setting_names) - UNKEYED_SETTINGS)
+        if unlisted:
+            missing[name] = unlisted
+    return missing
+
+class StageMemo:
+    """
+    Reuses node outputs across runs of the same topic and configuration
+
+    Each run (topic and render profile) has a manifest on disk recording, for every
+    memoised node, the hash of the state fields and settings it read and the fields it
+    returned. When a node is reached again with the same inputs and its output files
+    still exist, the recorded output is returned instead of running the node, so a
+    retry after a late failure only pays for the stages that actually changed.
+    """
+
+    def __init__(self, manifest_dir=None):
+        self.logger = Logger(__name__)
+        self.manifest_dir = manifest_dir or settings.RUN_MANIFEST_DIR
+        self.enabled = settings.STAGE_MEMO_ENABLED
+        self.max_age = settings.STAGE_MEMO_MAX_AGE_HOURS * 3600
+        self._lock = threading.Lock()  # Parallel branches of one run share its manifest
+
+    def manifest_path(self, state):
+        """Manifest file of the run a state belongs to"""
+        run = json.dumps([state.topic.strip().lower(), state.render_profile or settings.RENDER_PROFILE])
+        return os.path.join(self.manifest_dir, f"{hashlib.sha256(run.encode('utf-8')).hexdigest()[:16]}.json")
+
+    def load_manifest(self, state):
+        """
+        Read a run's manifest
+
+        Args:
+            state (WorkflowState): Any state of the run
+
+        Returns:
+            dict: topic, render_profile and stages (node name -> key, output, seconds, computed_at)
+        """
+        path = self.manifest_path(state)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable run manifest {path}: {e}")
+        return {"topic": state.topic, "render_profile": state.render_profile, "stages": {}}
+
+    def _record(self, state, name, entry):
+        """Add a node's output to the run manifest"""
+        with self._lock:
+            manifest = self.load_manifest(state)
+            manifest["stages"][name] = entry
+            path = self.manifest_path(state)
+            os.makedirs(self.manifest_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, default=list)
+            os.replace(temp_path, path)
+
+    @staticmethod
+    def _setting_value(name):
+        """A setting as keyed: file paths also carry the file's size and modification time"""
+        value = getattr(settings, name)
+        if name.endswith("_PATH") and isinstance(value, str) and os.path.isfile(value):
+            # A bumper, font or music file replaced in place must not reuse the old output
+            stat = os.stat(value)
+            return [value, stat.st_size, stat.st_mtime_ns]
+        return value
+
+    def stage_key(self, name, state):
+        """Hash of the state fields and settings a node reads"""
+        _, fields, setting_names, _ = MEMO_NODES[name]
+        payload = {
+            "node": name,
+            "inputs": {field: getattr(state, field) for field in fields},
+            "settings": {setting: self._setting_value(setting) for setting in setting_names},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=list).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _outputs_exist(output):
+        """Whether every file and blob a recorded output points to is still on disk"""
+        paths = [value for field, value in output.items() if field.endswith("_path") and value]
+        paths += output.get("image_paths", []) + list(output.get("rendition_paths", {}).values())
+        refs = [value for field, value in output.items() if field.endswith("_ref")]
+        return all(os.path.exists(path) for path in paths) and all(blob_store.exists(ref) for ref in refs)
+
+    def _forced(self, name, state):
+        """Whether --from-stage asks for this node to be recomputed"""
+        if not state.recompute_from:
+            return False
+        return STAGE_ORDER.index(MEMO_NODES[name][0]) >= STAGE_ORDER.index(state.recompute_from)
+
+    def wrap(self, name, node):
+        """
+        Memoise a workflow node
+
+        Args:
+            name (str): Node name, a key of MEMO_NODES
+            node (callable): Node function taking the state and returning changed fields
+
+        Returns:
+            callable: Node function that reuses a recorded output when its inputs are unchanged
+        """
+        def memoised(state):
+            if not self.enabled:
+                return node(state)
+
+            key = self.stage_key(name, state)
+            entry = self.load_manifest(state)["stages"].get(name)
+            if (entry and entry["key"] == key and not self._forced(name, state)
+                    and time.time() - entry["computed_at"] < self.max_age
+                    and self._outputs_exist(entry["output"])):
+                self.logger.info(f"Reusing {name} from an earlier run (saved {entry['seconds']:.1f}s)")
+                return entry["output"]
+
+            started = time.time()
+            output = node(state)
+            if not output.get("has_error"):
+                self._record(state, name, {"key": key, "output": output, "seconds": time.time() - started,
+                                           "computed_at": time.time()})
+            return output
+
+        memoised.__name__ = node.__name__
+        memoised.__doc__ = node.__doc__
+        return memoised
+
+stage_memo = StageMemo()
+
+if __name__ == "__main__":
+    unlisted = unlisted_settings()
+    for node_name, names in unlisted.items():
+        print(f"{node_name} reads settings missing from MEMO_NODES: {', '.join(names)}")
+    raise SystemExit(1 if unlisted else 0)
@@ -1,50 +1,62 @@
 # orchestration/nodes/media_nodes.py
+import re
 from services.tts_service import TTSService
 from services.image_generator import ImageGenerator
+from services.duration_estimator import NarrationDurationEstimator
+from langgraph.types import interrupt
+from orchestration.schema import store_blobs
+from utils.ffmpeg import get_render_profile
 from utils.logger import Logger
 
 logger = Logger(__name__)
 tts_service = TTSService()
 image_generator = ImageGenerator()
+duration_estimator = NarrationDurationEstimator()
 
 def generate_audio(state):
-    """Node to generate audio from script using TTS"""
+    """Node to generate audio from script using TTS (runs alongside generate_images, so it returns only its own fields)"""
     logger.info("Generating audio from script")
     
     try:
         # Update status
-        state_dict = state.dict()
-        state_dict["status_message"] = "Generating audio from script"
+        state_dict = {"status_message": "Generating audio from script"}
         print("EMOTION:")
         print(state.emotion)
-        # Generate audio
-        audio_path = tts_service.generate_audio(state.narration,state.emotion)
-        print("generated audio :{}",audio_path)
+        # Generate audio along with its exact duration and sentence/word timepoints
+        narration = tts_service.synthesize_narration(state.narration, state.emotion)
+        print("generated audio :{}",narration["audio_path"])
         # Update state
-        state_dict["audio_path"] = audio_path
+        state_dict["audio_path"] = narration["audio_path"]
+        state_dict["audio_duration"] = narration["duration"]
+        state_dict["sentence_timepoints"] = narration["sentences"]
+        state_dict["word_timepoints"] = narration["words"]
+        
+        # Calibrate the pre-synthesis duration estimate with the real length
+        duration_estimator.record(state.narration, state.emotion, narration["duration"])
         state_dict["status_message"] = "Audio generated successfully"
         
         return state_dict
         
     except Exception as e:
         logger.error(f"Error in generate_audio: {e}")
-        state_dict = state.dict()
+        state_dict = {}
         state_dict["error"] = f"Failed to generate audio: {str(e)}"
         state_dict["has_error"] = True
         state_dict["status_message"] = "Error generating audio"
         return state_dict
 
 def generate_images(state):
-    """Node to generate images from prompts"""
+    """Node to generate images from prompts (runs alongside generate_audio, so it returns only its own fields)"""
     logger.info(f"Generating images from {len(state.image_prompts)} prompts")
     
     try:
         # Update status
-        state_dict = state.dict()
-        state_dict["status_message"] = "Generating images from prompts"
+        state_dict = {"status_message": "Generating images from prompts"}
         
-        # Generate images
-        image_paths = image_generator.generate_images(state.image_prompts)
+        # Generate images (title cards use the headline and narration key points)
+        captions = _title_card_captions(state.title, state.narration, len(state.image_prompts))
+        frame_size = tuple(get_render_profile(state.render_profile or None)["frame_size"])
+        image_paths = image_generator.generate_images(state.image_prompts, captions, frame_size)
         
         # Update state
         state_dict["image_paths"] = image_paths
@@ -54,20 +66,32 @@ def generate_images(state):
         
     except Exception as e:
         logger.error(f"Error in generate_images: {e}")
-        state_dict = state.dict()
+        state_dict = {}
         state_dict["error"] = f"Failed to generate images: {str(e)}"
         state_dict["has_error"] = True
         state_dict["status_message"] = "Error generating images"
         return state_dict
 
+def _title_card_captions(title, narration, image_count):
+    """Spread the headline and narration sentences across the images for title cards"""
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', narration or "") if s.strip()]
+    captions = []
+    for i in range(image_count):
+        if i == 0 and title:
+            captions.append(title)
+        elif sentences:
+            captions.append(sentences[i * len(sentences) // image_count])
+        else:
+            captions.append(title)
+    return captions
+
 def check_pause_media(state):
-    """Node to check if workflow should pause after media generation"""
+    """Node that pauses for media review when that checkpoint is enabled"""
     logger.info("Checking if workflow should pause after media generation")
     
-    state_dict = state.dict()
-    
-    # If we're paused for media review, set the pause reason
-    if state.is_paused and state.pause_reason == "review_media":
-        state_dict["status_message"] = "Paused for media review. Click Continue when ready."
+    if not state.pause_checkpoints.get("review_media", False):
+        return {}
     
-    return state_dict
\ No newline at end of file
+    # Suspends the run (checkpointed, no CPU) until it is resumed with the reviewer's edits
+    edits = interrupt({"pause_reason": "review_media", "status_message": "Paused for media review. Click Continue when ready."})
+    return {**store_blobs(edits), "status_message": "Media review complete"}
\ No newline at end of file
@@ -1,5 +1,7 @@
 # orchestration/nodes/news_nodes.py
 from services.news_scraper import NewsScraper
+from langgraph.types import interrupt
+from orchestration.schema import store_blobs
 from utils.logger import Logger
 
 logger = Logger(__name__)
@@ -10,35 +12,36 @@ def fetch_and_consolidate_news(state):
     logger.info(f"Starting news fetch for topic: {state.topic}")
     
     try:
-        # Update status
-        state_dict = state.dict()
-        state_dict["status_message"] = f"Fetching news for: {state.topic}"
+        # Fetch the articles and consolidate them
+        articles = news_scraper.fetch_news(state.topic)
+        if articles:
+            consolidated_news = news_scraper.consolidate_news(articles, state.topic)
+        else:
+            logger.warning(f"No articles found for topic: {state.topic}")
+            consolidated_news = f"No recent news found for '{state.topic}'."
         
-        # Get consolidated news
-        consolidated_news = news_scraper.get_news_for_topic(state.topic)
-        
-        # Update state
-        state_dict["consolidated_news"] = consolidated_news
-        state_dict["status_message"] = "News fetched and consolidated successfully"
-        
-        return state_dict
+        # Return only the changed fields; the articles and summary go to the blob store
+        return store_blobs({
+            "raw_articles": articles,
+            "consolidated_news": consolidated_news,
+            "status_message": "News fetched and consolidated successfully"
+        })
         
     except Exception as e:
         logger.error(f"Error in fetch_and_consolidate_news: {e}")
-        state_dict = state.dict()
+        state_dict = {}
         state_dict["error"] = f"Failed to fetch news: {str(e)}"
         state_dict["has_error"] = True
         state_dict["status_message"] = "Error fetching news"
         return state_dict
 
 def check_pause_news(state):
-    """Node to check if workflow should pause after news consolidation"""
+    """Node that pauses for news review when that checkpoint is enabled"""
     logger.info("Checking if workflow should pause after news consolidation")
     
-    state_dict = state.dict()
-    
-    # If we're paused for news review, set the pause reason
-    if state.is_paused and state.pause_reason == "review_news":
-        state_dict["status_message"] = "Paused for news review. Click Continue when ready."
+    if not state.pause_checkpoints.get("review_news", False):
+        return {}
     
-    return state_dict
\ No newline at end of file
+    # Suspends the run (checkpointed, no CPU) until it is resumed with the reviewer's edits
+    edits = interrupt({"pause_reason": "review_news", "status_message": "Paused for news review. Click Continue when ready."})
+    return {**store_blobs(edits), "status_message": "News review complete"}
\ No newline at end of file
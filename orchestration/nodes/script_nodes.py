@@ -1,9 +1,14 @@
 # orchestration/nodes/script_nodes.py
+from config import settings
 from services.script_generator import ScriptGenerator
+from services.duration_estimator import NarrationDurationEstimator
+from langgraph.types import interrupt
+from orchestration.schema import store_blobs
 from utils.logger import Logger
 
 logger = Logger(__name__)
 script_generator = ScriptGenerator()
+duration_estimator = NarrationDurationEstimator()
 
 def generate_script_and_prompts(state):
     """Node to generate script and image prompts from consolidated news"""
@@ -11,8 +16,7 @@ def generate_script_and_prompts(state):
     
     try:
         # Update status
-        state_dict = state.dict()
-        state_dict["status_message"] = "Generating script and image prompts"
+        state_dict = {"status_message": "Generating script and image prompts"}
         
         # Generate script and prompts
         script, image_prompts, emotion, title, description = script_generator.generate_script_and_prompts(state.consolidated_news)
@@ -36,6 +40,12 @@ def generate_script_and_prompts(state):
         print("EMOTION:")
         print(emotion)
         
+        # Predict the narration length and trim or flag it before paying for TTS, images and rendering
+        narration_text, estimated_duration, duration_warning = check_narration_length(narration_text, emotion)
+        
+        # Only keep as many prompts as the narration has shots, before paying to enhance and generate them
+        image_prompts = select_image_prompts(image_prompts, estimated_duration)
+        
         # Enhance image prompts with more detailed descriptions
         enhanced_image_prompts = enhance_image_prompts(state.consolidated_news, image_prompts)
         print("ENHANCED IMAGE PROMPTS:")
@@ -46,19 +56,71 @@ def generate_script_and_prompts(state):
         state_dict["image_prompts"] = enhanced_image_prompts  # Use enhanced prompts instead
         state_dict["narration"] = narration_text  # Store as a single string
         state_dict["emotion"] = emotion
+        state_dict["estimated_duration"] = estimated_duration
+        state_dict["duration_warning"] = duration_warning
         state_dict["status_message"] = "Script and image prompts generated successfully"
         state_dict["title"] = title
         state_dict["description"] = description
-        return state_dict
+        return store_blobs(state_dict)
         
     except Exception as e:
         logger.error(f"Error in generate_script_and_prompts: {e}")
-        state_dict = state.dict()
+        state_dict = {}
         state_dict["error"] = f"Failed to generate script: {str(e)}"
         state_dict["has_error"] = True
         state_dict["status_message"] = "Error generating script"
         return state_dict
 
+def check_narration_length(narration_text, emotion):
+    """
+    Estimate the narration duration and trim or flag it if it would run past the target
+    
+    Returns:
+        tuple: (narration text, estimated seconds, warning message or "")
+    """
+    max_seconds = settings.NARRATION_MAX_SECONDS
+    estimated_duration = duration_estimator.estimate(narration_text, emotion)
+    logger.info(f"Estimated narration duration: {estimated_duration:.1f}s (target {max_seconds:.0f}s)")
+    
+    if estimated_duration <= max_seconds:
+        return narration_text, estimated_duration, ""
+    
+    if settings.NARRATION_OVERLENGTH_ACTION == "trim":
+        trimmed_text, trimmed_duration, dropped = duration_estimator.trim_to_duration(narration_text, emotion, max_seconds)
+        if dropped:
+            logger.warning(f"Trimmed {len(dropped)} sentences from narration ({estimated_duration:.1f}s -> {trimmed_duration:.1f}s)")
+            narration_text, estimated_duration = trimmed_text, trimmed_duration
+        if estimated_duration <= max_seconds:
+            return narration_text, estimated_duration, f"Narration trimmed by {len(dropped)} sentences to fit {max_seconds:.0f}s"
+    
+    warning = f"Narration is estimated at {estimated_duration:.1f}s, over the {max_seconds:.0f}s target"
+    logger.warning(warning)
+    return narration_text, estimated_duration, warning
+
+def select_image_prompts(image_prompts, estimated_duration):
+    """
+    Keep one prompt per shot of predicted narration, spread evenly across the story
+    
+    Args:
+        image_prompts (list): Prompts in story order
+        estimated_duration (float): Predicted narration duration in seconds
+        
+    Returns:
+        list: The prompts to enhance and generate
+    """
+    if not estimated_duration:
+        return image_prompts
+    
+    shot_count = round(estimated_duration / settings.IMAGE_SECONDS_PER_SHOT)
+    shot_count = max(settings.IMAGE_MIN_COUNT, min(settings.IMAGE_MAX_COUNT, shot_count))
+    if len(image_prompts) <= shot_count:
+        return image_prompts
+    
+    # Evenly spaced picks keep the first and last prompts and cover the middle of the story
+    indexes = sorted({round(i * (len(image_prompts) - 1) / max(shot_count - 1, 1)) for i in range(shot_count)})
+    logger.info(f"Using {len(indexes)} of {len(image_prompts)} image prompts for {estimated_duration:.1f}s of narration")
+    return [image_prompts[i] for i in indexes]
+
 def enhance_image_prompts(consolidated_news, original_prompts):
     """Function to enhance image prompts with more detailed descriptions using simplified strict formatting"""
     logger.info("Enhancing image prompts with more detailed descriptions")
@@ -163,6 +225,11 @@ def enhance_image_prompts(consolidated_news, original_prompts):
                 
             validated_prompts.append(fixed_prompt)
         
+        # Extra prompts would add shots beyond those select_image_prompts chose for the narration
+        if len(validated_prompts) > len(original_prompts):
+            logger.warning(f"Got {len(validated_prompts)} enhanced prompts for {len(original_prompts)} originals; keeping the first {len(original_prompts)}")
+            validated_prompts = validated_prompts[:len(original_prompts)]
+        
         # If we have fewer enhanced prompts than original ones, enhance the remaining
         if len(validated_prompts) < len(original_prompts):
             logger.warning(f"Only got {len(validated_prompts)} enhanced prompts from {len(original_prompts)} originals")
@@ -197,13 +264,12 @@ def enhance_image_prompts(consolidated_news, original_prompts):
         return enhanced_originals
 
 def check_pause_script(state):
-    """Node to check if workflow should pause after script generation"""
+    """Node that pauses for script review when that checkpoint is enabled"""
     logger.info("Checking if workflow should pause after script generation")
     
-    state_dict = state.dict()
-    
-    # If we're paused for script review, set the pause reason
-    if state.is_paused and state.pause_reason == "review_script":
-        state_dict["status_message"] = "Paused for script review. Click Continue when ready."
+    if not state.pause_checkpoints.get("review_script", False):
+        return {}
     
-    return state_dict
\ No newline at end of file
+    # Suspends the run (checkpointed, no CPU) until it is resumed with the reviewer's edits
+    edits = interrupt({"pause_reason": "review_script", "status_message": "Paused for script review. Click Continue when ready."})
+    return {**store_blobs(edits), "status_message": "Script review complete"}
\ No newline at end of file
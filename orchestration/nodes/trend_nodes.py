@@ -16,27 +16,11 @@ def fetch_trending_topics(state):
         best_topic = trends_scraper.get_best_trending_topic()
         logger.info(f"No topic provided by user. Using best trending topic: {best_topic}")
         return {
-            **state.dict(),
             "topic": best_topic,
-            "trending_topics": trends_scraper.get_trending_topics(),
             "status_message": f"Automatically selected trending topic: {best_topic}"
         }
     
-    # User provided a topic, but we still fetch trending topics for display
+    # User provided a topic; nothing to fetch
     return {
-        **state.dict(),
-        "trending_topics": trends_scraper.get_trending_topics(),
         "status_message": f"Continuing with user-selected topic: {state.topic}"
     }
-    
-def check_pause_script(state):
-    """Node to check if workflow should pause after script generation"""
-    logger.info("Checking if workflow should pause after script generation")
-    
-    state_dict = state.dict()
-    
-    # If we're paused for script review, set the pause reason
-    if state.is_paused and state.pause_reason == "review_script":
-        state_dict["status_message"] = "Paused for script review. Click Continue when ready."
-    
-    return state_dict  # Add this return statement which was missing
\ No newline at end of file
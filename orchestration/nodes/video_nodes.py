@@ -1,45 +1,105 @@
 # orchestration/nodes/video_nodes.py
+import os
+import random
+from config import settings
+from langgraph.types import interrupt
+from orchestration.schema import store_blobs
+from orchestration.memo import MEMO_NODES
 from services.video_editor import VideoEditor
 from utils.logger import Logger
 
 logger = Logger(__name__)
 video_editor = VideoEditor()
 
+# State fields the timeline is built from; a review edit to any of them invalidates the deferred render
+RENDER_INPUTS = [field for field in MEMO_NODES["assemble_video"][1] if field != "pause_checkpoints"]
+
+def _build_timeline(inputs, render_seed):
+    """Lay out the video for the given render inputs (field name -> value, see RENDER_INPUTS)"""
+    return video_editor.build_timeline(
+        inputs["audio_path"], inputs["image_paths"], f"assets/{inputs['emotion']}_bg_music.mp3",
+        audio_duration=inputs["audio_duration"],
+        sentence_timepoints=inputs["sentence_timepoints"],
+        word_timepoints=inputs["word_timepoints"],
+        profile=inputs["render_profile"] or None,
+        seed=render_seed
+    )
+
 def assemble_video(state):
     """Node to assemble video from audio and images"""
     logger.info("Assembling video from audio and images")
     
     try:
         # Update status
-        state_dict = state.dict()
-        state_dict["status_message"] = "Assembling video"
-        emotion = state.emotion
-        audio_path = f"assets/{emotion}_bg_music.mp3"
-        # Assemble video
-        video_path = video_editor.create_video(state.audio_path, state.image_paths,audio_path)
+        state_dict = {"status_message": "Assembling video"}
+        # Keep the seed across re-renders so unchanged segments keep their effects (and cache entries)
+        render_seed = state.render_seed or random.randint(1, 2**31 - 1)
+        state_dict["render_seed"] = render_seed
         
-        # Update state
+        # Lay out the video once; the preview and the final render share this timeline
+        timeline = _build_timeline({field: getattr(state, field) for field in RENDER_INPUTS}, render_seed)
+        video_path = video_editor.output_path(timeline)
+        state_dict["timeline"] = timeline
         state_dict["video_path"] = video_path
-        state_dict["status_message"] = "Video assembled successfully"
+        state_dict["rendition_paths"] = video_editor.rendition_paths(timeline, video_path)
+        
+        if state.pause_checkpoints.get("review_video", False):
+            # Review a quick preview; the full-quality render is deferred
+            preview = video_editor.preview_timeline(timeline)
+            preview_path = os.path.join(settings.TEMP_DIR, f"preview_{os.path.basename(video_path)}")
+            state_dict["preview_path"] = video_editor.render_timeline(preview, preview_path)
+            if settings.FINAL_RENDER_START == "background":
+                video_editor.start_render(timeline, video_path)
+            state_dict["status_message"] = "Video preview ready for review"
+        else:
+            video_editor.render_timeline(timeline, video_path)
+            state_dict["status_message"] = "Video assembled successfully"
         
         return state_dict
         
     except Exception as e:
         logger.error(f"Error in assemble_video: {e}")
-        state_dict = state.dict()
+        state_dict = {}
         state_dict["error"] = f"Failed to assemble video: {str(e)}"
         state_dict["has_error"] = True
         state_dict["status_message"] = "Error assembling video"
         return state_dict
 
 def check_pause_video(state):
-    """Node to check if workflow should pause after video assembly"""
+    """Node that pauses for video review when that checkpoint is enabled, then finishes the final render"""
     logger.info("Checking if workflow should pause after video assembly")
     
-    state_dict = state.dict()
+    state_dict = {}
+    edits = {}
+    
+    if state.pause_checkpoints.get("review_video", False):
+        # Suspends the run (checkpointed, no CPU) while the preview is reviewed
+        edits = store_blobs(interrupt({"pause_reason": "review_video", "status_message": "Paused for video review. Click Continue when ready."}))
+        state_dict.update(edits)
     
-    # If we're paused for video review, set the pause reason
-    if state.is_paused and state.pause_reason == "review_video":
-        state_dict["status_message"] = "Paused for video review. Click Continue when ready."
+    # Approved: make sure the deferred full-quality render has finished before upload
+    if state.preview_path:
+        try:
+            timeline, video_path = state.timeline, state.video_path
+            if any(field in edits for field in RENDER_INPUTS):
+                # The reviewer changed what the video is made of: render the edited version instead
+                logger.info("Review edits change the render inputs, re-rendering the final video")
+                video_editor.discard_render(timeline, video_path)
+                inputs = {field: edits.get(field, getattr(state, field)) for field in RENDER_INPUTS}
+                timeline = _build_timeline(inputs, inputs["render_seed"])
+                video_path = video_editor.output_path(timeline)
+                state_dict["timeline"] = timeline
+                state_dict["video_path"] = video_path
+                state_dict["rendition_paths"] = video_editor.rendition_paths(timeline, video_path)
+            video_editor.finish_render(timeline, video_path)
+            if os.path.exists(state.preview_path):
+                os.remove(state.preview_path)
+            state_dict["preview_path"] = ""
+            state_dict["status_message"] = "Video assembled successfully"
+        except Exception as e:
+            logger.error(f"Error in check_pause_video: {e}")
+            state_dict["error"] = f"Failed to render final video: {str(e)}"
+            state_dict["has_error"] = True
+            state_dict["status_message"] = "Error rendering final video"
     
     return state_dict
\ No newline at end of file
@@ -1,35 +1,94 @@
 # orchestration/schema.py
-from typing import TypedDict, List, Optional, Dict, Any
+import operator
+from typing import TypedDict, List, Optional, Dict, Any, Annotated
 from pydantic import BaseModel
+from utils.blob_store import blob_store
+
+# Large payloads live in the blob store; the state carries a <name>_ref for each
+BLOB_FIELDS = ("raw_articles", "consolidated_news", "script", "image_prompts")
+
+def _latest(current, update):
+    """Reducer keeping the most recent write when parallel branches update a field in the same step"""
+    return update
+
+def _merge_errors(current, update):
+    """Reducer combining error messages from parallel branches, ignoring repeats of a message already kept"""
+    if not update or update in current.split("; "):
+        return current
+    return f"{current}; {update}" if current else update
+
+def store_blobs(update):
+    """
+    Move large payloads of a node update into the blob store
+    
+    Args:
+        update (dict): Fields returned by a node, possibly including any of BLOB_FIELDS
+        
+    Returns:
+        dict: The update with those fields replaced by their <name>_ref references
+    """
+    update = dict(update or {})
+    for name in BLOB_FIELDS:
+        if name in update:
+            update[f"{name}_ref"] = blob_store.put(update.pop(name))
+    return update
 
 class WorkflowState(BaseModel):
     """Schema for the workflow state"""
     # Input
     topic: str = ""
     
-    # News data
-    raw_articles: List[Dict[str, str]] = []
-    consolidated_news: str = ""
+    # News data (blob store references)
+    raw_articles_ref: str = ""
+    consolidated_news_ref: str = ""
     
     # Generated content
-    script: str = ""
+    script_ref: str = ""
     narration: str=""
     title: str=""
     description: str=""
     emotion: str="excited"
-    image_prompts: List[str] = []
+    estimated_duration: float = 0.0
+    duration_warning: str = ""
+    image_prompts_ref: str = ""
     audio_path: str = ""
+    audio_duration: float = 0.0
+    sentence_timepoints: List[Dict[str, Any]] = []
+    word_timepoints: List[Dict[str, Any]] = []
     image_paths: List[str] = []
     video_path: str = ""
+    render_seed: int = 0  # Seeds the per-segment effects; set on the first render and kept for re-renders
+    render_profile: str = ""  # Name from settings.RENDER_PROFILES; empty uses settings.RENDER_PROFILE
+    timeline: Dict[str, Any] = {}  # Rendered timeline, so a deferred final render reuses the reviewed effects
+    preview_path: str = ""
+    rendition_paths: Dict[str, str] = {}  # Render profile name -> video path of every output rendition
     
     # Upload data
     upload_status: Dict[str, Any] = {}
     
     # Workflow state
-    status_message: str = "Ready to start"
+    pause_checkpoints: Dict[str, bool] = {}
+    recompute_from: str = ""  # Stage from orchestration.memo.STAGE_ORDER; memoised outputs from it onwards are recomputed
+    status_message: Annotated[str, _latest] = "Ready to start"
     is_paused: bool = False
     pause_reason: str = ""
     
     # Error handling
-    error: str = ""
-    has_error: bool = False
\ No newline at end of file
+    error: Annotated[str, _merge_errors] = ""
+    has_error: Annotated[bool, operator.or_] = False
+    
+    @property
+    def raw_articles(self) -> List[Dict[str, Any]]:
+        return blob_store.get(self.raw_articles_ref, [])
+    
+    @property
+    def consolidated_news(self) -> str:
+        return blob_store.get(self.consolidated_news_ref, "")
+    
+    @property
+    def script(self) -> str:
+        return blob_store.get(self.script_ref, "")
+    
+    @property
+    def image_prompts(self) -> List[str]:
+        return blob_store.get(self.image_prompts_ref, [])
\ No newline at end of file
@@ -0,0 +1,194 @@
+# orchestration/supervisor.py
+import time
+import uuid
+import queue
+import threading
+from config import settings
+from orchestration.workflow import workflow
+from orchestration.schema import WorkflowState
+from orchestration.nodes.upload_nodes import upload_queue
+from utils.logger import Logger
+
+# Pipeline stages as slices of the workflow graph: (stage name, node the stage stops after)
+STAGES = [
+    ("news", "check_pause_news"),
+    ("script", "check_pause_script"),
+    ("media", "check_pause_media"),
+    ("render", "check_pause_video"),
+    ("upload", None),  # Runs to the end of the graph
+]
+
+class BatchSupervisor:
+    """
+    Runs many topics through the workflow graph as a staged pipeline
+
+    Each topic is its own checkpointed thread of the graph. A stage resumes that thread
+    and runs it up to the stage's last node, so every topic goes through the same nodes
+    as the Streamlit app. Stages are connected by bounded queues and each has its own
+    worker limit, so one topic's script can be written while another renders and a
+    third uploads, without any stage running ahead of the ones after it.
+    """
+
+    def __init__(self, stage_workers=None, queue_size=None, render_profile="", recompute_from=""):
+        self.logger = Logger(__name__)
+        self.stage_workers = {name: 1 for name, _ in STAGES}
+        self.stage_workers.update(settings.BATCH_STAGE_WORKERS)
+        self.stage_workers.update(stage_workers or {})
+        self.queue_size = queue_size or settings.BATCH_QUEUE_SIZE
+        self.render_profile = render_profile
+        self.recompute_from = recompute_from
+        self._lock = threading.Lock()
+
+    def _run_stage(self, stage, stop_after, job):
+        """Run one topic's graph thread through a stage; returns False if the topic failed"""
+        config = {"configurable": {"thread_id": job["thread_id"]}}
+        if job["started"] is None:
+            job["started"] = time.time()
+            workflow_input = WorkflowState(topic=job["topic"], render_profile=self.render_profile,
+                                           recompute_from=self.recompute_from, pause_checkpoints={})
+        else:
+            workflow_input = None  # Continue from the checkpoint left by the previous stage
+
+        started = time.time()
+        try:
+            workflow.invoke(workflow_input, config, interrupt_after=[stop_after] if stop_after else None)
+            values = workflow.get_state(config).values
+        except Exception as e:
+            values = {"has_error": True, "error": str(e)}
+        elapsed = time.time() - started
+
+        with self._lock:
+            job["stages"][stage] = elapsed
+            if values.get("has_error"):
+                job["status"] = "failed"
+                job["error"] = values.get("error", "")
+                job["finished"] = time.time()
+                self.logger.error(f"[{job['topic']}] {stage} failed after {elapsed:.1f}s: {job['error']}")
+                return False
+
+            self.logger.info(f"[{job['topic']}] {stage} done in {elapsed:.1f}s")
+            if stop_after is None:
+                job["status"] = "queued_for_upload"
+                job["upload_job_id"] = values.get("upload_status", {}).get("job_id")
+                job["video_path"] = values.get("video_path", "")
+                job["finished"] = time.time()
+            return True
+
+    def _stage_worker(self, stage, stop_after, inbox, outbox):
+        """Take topics from inbox, run the stage and pass survivors to outbox until told to stop"""
+        while True:
+            job = inbox.get()
+            if job is None:
+                return
+            if self._run_stage(stage, stop_after, job) and outbox is not None:
+                outbox.put(job)  # Blocks while the next stage is full, which holds this stage back
+
+    def run(self, topics):
+        """
+        Run a batch of topics through the pipeline
+
+        Args:
+            topics (list): News topics, one video each
+
+        Returns:
+            dict: Throughput report (see report)
+        """
+        jobs = [
+            {"topic": topic, "thread_id": f"batch-{uuid.uuid4()}", "status": "running", "stages": {},
+             "started": None, "finished": None, "error": "", "upload_job_id": None, "video_path": ""}
+            for topic in topics
+        ]
+        self.logger.info(f"Starting batch of {len(jobs)} topics with stage workers {self.stage_workers}")
+        started = time.time()
+
+        # inboxes[i] feeds stage i; the last stage has no outbox
+        inboxes = [queue.Queue(maxsize=self.queue_size) for _ in STAGES]
+        threads = []
+        for index, (stage, stop_after) in enumerate(STAGES):
+            outbox = inboxes[index + 1] if index + 1 < len(STAGES) else None
+            workers = [
+                threading.Thread(target=self._stage_worker, args=(stage, stop_after, inboxes[index], outbox),
+                                 name=f"{stage}-{n}", daemon=True)
+                for n in range(max(self.stage_workers.get(stage, 1), 1))
+            ]
+            for worker in workers:
+                worker.start()
+            threads.append(workers)
+
+        for job in jobs:
+            inboxes[0].put(job)
+
+        # Shut the pipeline down front to back once each stage has drained
+        for index, workers in enumerate(threads):
+            for _ in workers:
+                inboxes[index].put(None)
+            for worker in workers:
+                worker.join()
+
+        return self.report(jobs, time.time() - started)
+
+    def wait_for_uploads(self, jobs, timeout=None):
+        """
+        Wait until the batch's uploads are confirmed or have failed
+
+        Uploads still waiting (for example on the daily quota) stay in the durable
+        upload queue and are picked up by the next run.
+
+        Args:
+            jobs (list): Jobs from the report returned by run
+            timeout (float, optional): Seconds to wait at most
+        """
+        timeout = settings.BATCH_UPLOAD_WAIT if timeout is None else timeout
+        deadline = time.time() + timeout
+        pending = {job["upload_job_id"]: job for job in jobs if job["upload_job_id"]}
+
+        while pending and time.time() < deadline:
+            for job_id, job in list(pending.items()):
+                upload = upload_queue.get(job_id) or {}
+                if upload.get("status") in ("done", "failed"):
+                    job["status"] = "uploaded" if upload["status"] == "done" else "upload_failed"
+                    job["video_url"] = upload.get("video_url")
+                    job["error"] = upload.get("error") or job["error"]
+                    del pending[job_id]
+            if pending:
+                time.sleep(upload_queue.poll_interval)
+
+        if pending:
+            self.logger.warning(f"{len(pending)} uploads still queued; the next run continues them")
+
+    def report(self, jobs, elapsed):
+        """
+        Summarise a batch
+
+        Videos count as completed once produced, whatever their upload outcome (queued,
+        uploaded or upload failed); call again after wait_for_uploads to count the outcomes.
+
+        Args:
+            jobs (list): Job records
+            elapsed (float): Wall-clock seconds of the batch
+
+        Returns:
+            dict: jobs, elapsed seconds, completed, failed, uploaded and upload_failed counts,
+                videos per hour and per-stage timings
+        """
+        completed = [job for job in jobs if job["status"] in ("queued_for_upload", "uploaded", "upload_failed")]
+        stages = {}
+        for stage, _ in STAGES:
+            times = [job["stages"][stage] for job in jobs if stage in job["stages"]]
+            busy = sum(times)
+            stages[stage] = {
+                "runs": len(times),
+                "mean_seconds": busy / len(times) if times else 0.0,
+                # Share of the stage's worker time spent busy over the batch
+                "utilisation": busy / (elapsed * max(self.stage_workers.get(stage, 1), 1)) if elapsed else 0.0,
+            }
+        return {
+            "jobs": jobs,
+            "elapsed": elapsed,
+            "completed": len(completed),
+            "failed": sum(job["status"] == "failed" for job in jobs),
+            "uploaded": sum(job["status"] == "uploaded" for job in jobs),
+            "upload_failed": sum(job["status"] == "upload_failed" for job in jobs),
+            "videos_per_hour": len(completed) * 3600 / elapsed if elapsed else 0.0,
+            "stages": stages,
+        }
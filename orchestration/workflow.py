@@ -1,6 +1,10 @@
 #orchestration/workflow.py
+import sqlite3
 from langgraph.graph import StateGraph
+from langgraph.checkpoint.sqlite import SqliteSaver
+from config import settings
 from .schema import WorkflowState
+from .memo import stage_memo
 from .nodes import news_nodes, script_nodes, media_nodes, video_nodes, upload_nodes, trend_nodes
 
 def create_workflow_graph():
@@ -8,26 +12,26 @@ def create_workflow_graph():
     # Create a new graph with our state type
     graph = StateGraph(WorkflowState)
     
-    # Define all nodes (grouped by logical function)
+    # Define all nodes (grouped by logical function); costly stages reuse outputs of earlier runs
     
     # Trending topics node
     graph.add_node("fetch_trending_topics", trend_nodes.fetch_trending_topics)
     
     # News related nodes
-    graph.add_node("fetch_and_consolidate_news", news_nodes.fetch_and_consolidate_news)
+    graph.add_node("fetch_and_consolidate_news", stage_memo.wrap("fetch_and_consolidate_news", news_nodes.fetch_and_consolidate_news))
     graph.add_node("check_pause_news", news_nodes.check_pause_news)
     
     # Script related nodes
-    graph.add_node("generate_script_and_prompts", script_nodes.generate_script_and_prompts)
+    graph.add_node("generate_script_and_prompts", stage_memo.wrap("generate_script_and_prompts", script_nodes.generate_script_and_prompts))
     graph.add_node("check_pause_script", script_nodes.check_pause_script)
     
     # Media generation nodes
-    graph.add_node("generate_audio", media_nodes.generate_audio)
-    graph.add_node("generate_images", media_nodes.generate_images)
+    graph.add_node("generate_audio", stage_memo.wrap("generate_audio", media_nodes.generate_audio))
+    graph.add_node("generate_images", stage_memo.wrap("generate_images", media_nodes.generate_images))
     graph.add_node("check_pause_media", media_nodes.check_pause_media)
     
     # Video creation nodes
-    graph.add_node("assemble_video", video_nodes.assemble_video)
+    graph.add_node("assemble_video", stage_memo.wrap("assemble_video", video_nodes.assemble_video))
     graph.add_node("check_pause_video", video_nodes.check_pause_video)
     
     # Upload related nodes
@@ -36,61 +40,33 @@ def create_workflow_graph():
     # Final node
     graph.add_node("finish_workflow", lambda state: {})
     
-    # Define conditional edges
+    # Define edges; review checkpoints pause inside the check_pause_* nodes with interrupt()
     
     # Define the workflow path with trending topics
     graph.add_edge("fetch_trending_topics", "fetch_and_consolidate_news")
     graph.add_edge("fetch_and_consolidate_news", "check_pause_news")
     
     # From check_pause_news
-    graph.add_conditional_edges(
-        "check_pause_news",
-        lambda state: "paused" if state.is_paused else "continue",
-        {
-            "paused": "check_pause_news",  # Loop back to self until unpaused
-            "continue": "generate_script_and_prompts"
-        }
-    )
+    graph.add_edge("check_pause_news", "generate_script_and_prompts")
     
     # Script generation
     graph.add_edge("generate_script_and_prompts", "check_pause_script")
     
-    # From check_pause_script
-    graph.add_conditional_edges(
-        "check_pause_script",
-        lambda state: "paused" if state.is_paused else "continue",
-        {
-            "paused": "check_pause_script",  # Loop back to self until unpaused
-            "continue": "generate_audio"
-        }
-    )
+    # From check_pause_script: fan out so TTS and image generation run in parallel
+    graph.add_edge("check_pause_script", "generate_audio")
+    graph.add_edge("check_pause_script", "generate_images")
     
-    # Media generation flow
-    graph.add_edge("generate_audio", "generate_images")
-    graph.add_edge("generate_images", "check_pause_media")
+    # Media generation flow: check_pause_media waits for both branches
+    graph.add_edge(["generate_audio", "generate_images"], "check_pause_media")
     
     # From check_pause_media
-    graph.add_conditional_edges(
-        "check_pause_media",
-        lambda state: "paused" if state.is_paused else "continue",
-        {
-            "paused": "check_pause_media",  # Loop back to self until unpaused
-            "continue": "assemble_video"
-        }
-    )
+    graph.add_edge("check_pause_media", "assemble_video")
     
     # Video creation flow
     graph.add_edge("assemble_video", "check_pause_video")
     
     # From check_pause_video
-    graph.add_conditional_edges(
-        "check_pause_video",
-        lambda state: "paused" if state.is_paused else "continue",
-        {
-            "paused": "check_pause_video",  # Loop back to self until unpaused
-            "continue": "upload_video"
-        }
-    )
+    graph.add_edge("check_pause_video", "upload_video")
     
     # Final edge
     graph.add_edge("upload_video", "finish_workflow")
@@ -98,8 +74,9 @@ def create_workflow_graph():
     # Set the entry point
     graph.set_entry_point("fetch_trending_topics")
     
-    # Compile the graph
-    return graph.compile()
+    # Compile the graph with a persistent checkpointer so paused runs resume where they stopped
+    connection = sqlite3.connect(settings.WORKFLOW_CHECKPOINT_PATH, check_same_thread=False)
+    return graph.compile(checkpointer=SqliteSaver(connection))
 
 # Create the workflow
 workflow = create_workflow_graph()
\ No newline at end of file
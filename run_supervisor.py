@@ -0,0 +1,83 @@
+# run_supervisor.py
+import time
+import argparse
+from config import settings
+from orchestration.supervisor import BatchSupervisor, STAGES
+from orchestration.memo import STAGE_ORDER
+from orchestration.nodes.upload_nodes import upload_queue
+from services.trends_scraper import TrendsScraper
+from utils.logger import Logger
+
+logger = Logger(__name__)
+
+def parse_args():
+    """Command-line options"""
+    parser = argparse.ArgumentParser(description="Generate news videos for a batch of topics without the Streamlit UI")
+    parser.add_argument("topics", nargs="*", help="Topics to make videos about")
+    parser.add_argument("--top", type=int, default=0, help="Also use the top N Google Trends topics")
+    parser.add_argument("--workers", default="",
+                        help=f"Per-stage worker limits, e.g. render=2,upload=1 (stages: {', '.join(name for name, _ in STAGES)})")
+    parser.add_argument("--queue-size", type=int, default=settings.BATCH_QUEUE_SIZE,
+                        help="Topics allowed to wait between two stages")
+    parser.add_argument("--profile", default="", help="Render profile (default: settings.RENDER_PROFILE)")
+    parser.add_argument("--from-stage", choices=STAGE_ORDER, default="",
+                        help="Recompute this stage and the ones after it instead of reusing earlier runs' outputs")
+    parser.add_argument("--no-wait-uploads", action="store_true",
+                        help="Exit once videos are queued for upload instead of waiting for YouTube")
+    parser.add_argument("--interval", type=float, default=0,
+                        help="Run as a daemon, starting a new batch every N minutes")
+    return parser.parse_args()
+
+def batch_topics(args):
+    """Topics given on the command line followed by the top trending ones"""
+    topics = list(args.topics)
+    if args.top:
+        trending = TrendsScraper().get_trending_topics()
+        topics += [topic for topic in trending if topic not in topics][:args.top]
+    return topics
+
+def print_report(report):
+    """Print a batch's throughput report"""
+    print(f"\n{report['completed']} videos in {report['elapsed'] / 60:.1f} min "
+          f"({report['videos_per_hour']:.1f} videos/hour), {report['failed']} failed")
+    print(f"  {report['uploaded']} uploaded, {report['upload_failed']} uploads failed, "
+          f"{report['completed'] - report['uploaded'] - report['upload_failed']} waiting to upload")
+    for stage, stats in report["stages"].items():
+        print(f"  {stage:<8} {stats['runs']:>3} runs  {stats['mean_seconds']:>7.1f}s mean  "
+              f"{stats['utilisation'] * 100:>5.1f}% busy")
+    for job in report["jobs"]:
+        detail = job.get("video_url") or job["error"] or job["video_path"]
+        print(f"  [{job['status']}] {job['topic']}: {detail}")
+
+def run_batch(args):
+    """Run one batch and report it"""
+    topics = batch_topics(args)
+    if not topics:
+        logger.warning("No topics to process")
+        return
+
+    stage_workers = {name.strip(): int(count) for name, count in
+                     (item.split("=") for item in args.workers.split(",") if item.strip())}
+    supervisor = BatchSupervisor(stage_workers, args.queue_size, args.profile, args.from_stage)
+
+    # Uploads left over from earlier runs are resumed alongside this batch
+    upload_queue.start()
+    report = supervisor.run(topics)
+    if not args.no_wait_uploads:
+        supervisor.wait_for_uploads(report["jobs"])
+        report = supervisor.report(report["jobs"], report["elapsed"])
+    print_report(report)
+
+def main():
+    """Run a batch now, or keep running batches on an interval"""
+    args = parse_args()
+    while True:
+        started = time.time()
+        run_batch(args)
+        if not args.interval:
+            break
+        time.sleep(max(args.interval * 60 - (time.time() - started), 0))
+    upload_queue.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#services/audio_mixer.py
+import os
+import wave
+import hashlib
+import numpy as np
+from config import settings
+from utils.ffmpeg import run_ffmpeg
+from utils.logger import Logger
+
+class AudioMixer:
+    """
+    Mixes the narration with its music bed in NumPy
+
+    Music beds are decoded once to float32 PCM and cached as .npy files that are
+    memory-mapped on later renders. The bed is tiled or trimmed to the narration and
+    ducked under speech by a gain curve derived from the narration's envelope.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.logger = Logger(__name__)
+        self.cache_dir = cache_dir or settings.AUDIO_CACHE_DIR
+        self.sample_rate = 44100
+        self.channels = 2
+        self.window = 0.01  # Envelope resolution in seconds
+        self.attack = 0.05  # Gain ramp length in seconds, centred so the duck starts just ahead of speech
+        self.release = settings.AUDIO_DUCK_RELEASE
+        self.threshold_db = settings.AUDIO_DUCK_THRESHOLD_DB
+        self.bed_volume = settings.AUDIO_BED_VOLUME
+
+    def _decode(self, path):
+        """Decode any audio file to float32 PCM at the mixer's rate and channel count"""
+        pcm = run_ffmpeg([
+            "-i", path, "-f", "f32le", "-acodec", "pcm_f32le",
+            "-ac", str(self.channels), "-ar", str(self.sample_rate), "-"
+        ])
+        return np.frombuffer(pcm, dtype=np.float32).reshape(-1, self.channels)
+
+    def load_narration(self, path):
+        """
+        Load the narration as float32 PCM, reading 16-bit WAV directly instead of decoding through ffmpeg
+
+        Args:
+            path (str): Path to the narration audio
+
+        Returns:
+            numpy.ndarray: (samples, channels) float32 array at the mixer's rate
+        """
+        if not path.lower().endswith(".wav"):
+            return self._decode(path)
+
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                return self._decode(path)
+            rate = wav.getframerate()
+            channels = wav.getnchannels()
+            pcm = wav.readframes(wav.getnframes())
+
+        samples = np.frombuffer(pcm, dtype="<i2").reshape(-1, channels).astype(np.float32) / 32768.0
+        samples = samples.mean(axis=1, keepdims=True) if channels != self.channels else samples
+        if rate != self.sample_rate and len(samples):
+            # Linear resampling is plenty for speech, which has little energy near the TTS Nyquist limit
+            positions = np.arange(int(round(len(samples) * self.sample_rate / rate))) * rate / self.sample_rate
+            samples = np.stack([np.interp(positions, np.arange(len(samples)), channel) for channel in samples.T], axis=1)
+        return np.ascontiguousarray(np.broadcast_to(samples, (len(samples), self.channels)), dtype=np.float32)
+
+    def load_bed(self, path):
+        """
+        Load a music bed, decoding it only the first time it is used
+
+        Args:
+            path (str): Path to the music file
+
+        Returns:
+            numpy.ndarray: Read-only (samples, channels) float32 array mapped from the cache
+        """
+        stat = os.stat(path)
+        key = hashlib.sha256(
+            f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{self.sample_rate}:{self.channels}".encode("utf-8")
+        ).hexdigest()
+        cache_path = os.path.join(self.cache_dir, f"{key}.npy")
+
+        if not os.path.exists(cache_path):
+            self.logger.info(f"Decoding music bed {path}")
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp.npy"
+            np.save(temp_path, self._decode(path))
+            os.replace(temp_path, cache_path)
+
+        return np.load(cache_path, mmap_mode="r")
+
+    def duck_gain(self, narration, ducked_volume):
+        """
+        Per-sample gain for the music bed: ducked_volume under speech, the bed volume in pauses
+
+        Args:
+            narration (numpy.ndarray): (samples, channels) narration PCM
+            ducked_volume (float): Bed gain while the narrator is speaking
+
+        Returns:
+            numpy.ndarray: Gain for every sample
+        """
+        hop = int(self.sample_rate * self.window)
+        mono = narration.mean(axis=1)
+        frames = -(-len(mono) // hop)
+        padded = np.zeros(frames * hop, dtype=np.float32)
+        padded[:len(mono)] = mono
+
+        rms = np.sqrt(np.mean(np.square(padded.reshape(frames, hop)), axis=1))
+        speaking = 20 * np.log10(rms + 1e-9) > self.threshold_db
+
+        # Hold the duck for the release time after speech so short pauses don't pump the music
+        hold = max(int(self.release / self.window), 1)
+        speaking = np.convolve(speaking, np.ones(hold), mode="full")[:frames] > 0
+
+        gain = np.where(speaking, ducked_volume, self.bed_volume)
+        ramp = max(int(self.attack / self.window), 1)
+        gain = np.convolve(np.pad(gain, ramp, mode="edge"), np.ones(ramp) / ramp, mode="same")[ramp:-ramp]
+
+        return np.interp(np.arange(len(mono)) / hop, np.arange(frames) + 0.5, gain).astype(np.float32)
+
+    def mix(self, timeline, output_path):
+        """
+        Mix a timeline's narration and music bed into one WAV track
+
+        Args:
+            timeline (dict): Timeline from VideoEditor.build_timeline
+            output_path (str): Path of the WAV file to write
+
+        Returns:
+            str: Path to the mixed track
+        """
+        total = int(round(timeline["duration"] * self.sample_rate))
+        narration = self.load_narration(timeline["audio_path"])[:total]
+        mixed = np.zeros((total, self.channels), dtype=np.float32)
+        mixed[:len(narration)] = narration
+
+        if timeline.get("bg_music_path"):
+            bed = self.load_bed(timeline["bg_music_path"])
+            if len(bed) == 0:
+                self.logger.warning(f"Music bed {timeline['bg_music_path']} has no audio, mixing narration only")
+            else:
+                # Loop the bed if it is shorter than the narration, otherwise trim it
+                if len(bed) < total:
+                    bed = np.tile(bed, (-(-total // len(bed)), 1))
+                mixed += bed[:total] * self.duck_gain(mixed, timeline["bg_volume"])[:, None]
+
+        pcm = (np.clip(mixed, -1.0, 1.0) * 32767).astype("<i2")
+        with wave.open(output_path, "wb") as wav:
+            wav.setnchannels(self.channels)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm.tobytes())
+
+        return output_path
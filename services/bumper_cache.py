@@ -0,0 +1,142 @@
+#services/bumper_cache.py
+import os
+import json
+import hashlib
+from config import settings
+from utils.ffmpeg import run_ffmpeg, has_audio_stream, video_frame_times, video_encoder_args, audio_encoder_args
+from utils.logger import Logger
+
+# Bumper files treated as still images and held on screen for settings.BUMPER_IMAGE_SECONDS
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+
+class BumperCache:
+    """
+    Intro/outro stings encoded once per render profile and joined to videos by stream copy
+
+    A bumper is scaled and padded to the profile's frame, encoded with the same video
+    and audio parameters as the main render and cached by the hash of its content and
+    those parameters. Attaching it is a concat-demuxer join, so branding costs no
+    encoding per video.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.logger = Logger(__name__)
+        self.cache_dir = cache_dir or settings.BUMPER_CACHE_DIR
+        self.image_seconds = settings.BUMPER_IMAGE_SECONDS
+
+    def _cache_key(self, path, profile):
+        """Hash of the bumper's bytes and the profile settings it is encoded with"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        encoding = {k: v for k, v in profile.items() if k not in ("name", "threads")}
+        if self._is_image(path):
+            encoding["image_seconds"] = self.image_seconds
+        digest.update(json.dumps(encoding, sort_keys=True, default=list).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _is_image(path):
+        """Whether a bumper is a still image rather than a video"""
+        return path.lower().endswith(IMAGE_EXTENSIONS)
+
+    def prepare(self, path, profile):
+        """
+        Get a bumper encoded for a render profile, encoding it on first use
+
+        Args:
+            path (str): Path to the bumper video, or a still image shown for settings.BUMPER_IMAGE_SECONDS
+            profile (dict): Render profile of the video it will be joined to
+
+        Returns:
+            str: Path to the encoded bumper in the cache
+        """
+        cache_path = os.path.join(self.cache_dir, f"{self._cache_key(path, profile)}.mp4")
+        if os.path.exists(cache_path):
+            return cache_path
+
+        self.logger.info(f"Encoding bumper {path} for the {profile['name']} profile")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        width, height = profile["frame_size"]
+        fps = profile["fps"]
+
+        if self._is_image(path):
+            # A still image is a single frame: loop it, and its silence, for the bumper's length
+            length = ["-t", f"{self.image_seconds:.3f}"]
+            args = ["-loop", "1", *length, "-i", path]
+        else:
+            length = []
+            args = ["-i", path]
+        if not self._is_image(path) and has_audio_stream(path):
+            audio_map = "0:a:0"
+        else:
+            # Silent bumpers still need an audio track to join a video that has one
+            args += ["-f", "lavfi", *length, "-i", "anullsrc=channel_layout=stereo:sample_rate=44100"]
+            audio_map = "1:a"
+
+        temp_path = f"{cache_path}.{os.getpid()}.tmp.mp4"
+        run_ffmpeg(args + [
+            "-map", "0:v:0", "-map", audio_map,
+            "-vf", f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                   f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps}",
+            "-af", "aformat=sample_rates=44100:channel_layouts=stereo",
+            *video_encoder_args(profile),
+            *audio_encoder_args(profile), "-shortest", temp_path
+        ])
+        os.replace(temp_path, cache_path)
+        return cache_path
+
+    def _check_join(self, parts, joined_path, fps):
+        """Raise unless the joined video has every part's frames at an even frame interval"""
+        # A part with a different timescale joins with squeezed or non-monotonic timestamps
+        expected_frames = sum(len(video_frame_times(part)) for part in parts)
+        times = video_frame_times(joined_path)
+        frame = 1.0 / fps
+        duration = times[-1] - times[0] + frame if times else 0.0
+        steps_even = all(0.5 * frame < b - a < 1.5 * frame for a, b in zip(times, times[1:]))
+        if len(times) != expected_frames or not steps_even or abs(duration - expected_frames * frame) > frame:
+            spacing = "even" if steps_even else "uneven"
+            raise RuntimeError(f"Joining bumpers to {joined_path} gave {len(times)} frames over {duration:.2f}s "
+                               f"with {spacing} timestamps, expected {expected_frames} frames over "
+                               f"{expected_frames * frame:.2f}s; the parts' timescales probably differ")
+
+    def attach(self, video_path, profile, intro_path="", outro_path=""):
+        """
+        Join the intro and outro to a rendered video in place, without re-encoding
+
+        Args:
+            video_path (str): Rendered video encoded with the profile
+            profile (dict): Render profile of the video
+            intro_path (str, optional): Bumper played before the video
+            outro_path (str, optional): Bumper played after the video
+
+        Returns:
+            str: video_path
+        """
+        parts = []
+        if intro_path:
+            parts.append(self.prepare(intro_path, profile))
+        parts.append(video_path)
+        if outro_path:
+            parts.append(self.prepare(outro_path, profile))
+        if len(parts) == 1:
+            return video_path
+
+        base = os.path.splitext(video_path)[0]
+        list_path = f"{base}_bumpers.txt"
+        joined_path = f"{base}_bumpers.mp4"
+        with open(list_path, "w") as f:
+            for part in parts:
+                escaped = os.path.abspath(part).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        try:
+            run_ffmpeg(["-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", "-movflags", "+faststart", joined_path])
+            self._check_join(parts, joined_path, profile["fps"])
+            os.replace(joined_path, video_path)
+        finally:
+            for path in (list_path, joined_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        return video_path
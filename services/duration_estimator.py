@@ -0,0 +1,160 @@
+#services/duration_estimator.py
+import os
+import re
+import json
+import threading
+import numpy as np
+from config import settings
+from services.tts_service import EMOTION_SETTINGS
+from utils.logger import Logger
+
+class NarrationDurationEstimator:
+    def __init__(self, calibration_path=None):
+        self.logger = Logger(__name__)
+        self.calibration_path = calibration_path or settings.DURATION_CALIBRATION_PATH
+        # Seconds per syllable, per short pause (, ; : -) and per sentence end at prosody rate 1.0
+        self.default_coefficients = [0.21, 0.20, 0.45]
+        self.min_samples = 5  # Past runs needed before fitting our own coefficients
+        self.max_samples = 200
+        self._samples = []
+        self._coefficients = list(self.default_coefficients)
+        self._loaded_mtime = None
+        self._lock = threading.RLock()  # Parallel workflows share one estimator and calibration file
+
+    def _reload(self):
+        """Reload calibration samples if another process or instance has recorded new runs"""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.calibration_path)
+            except OSError:
+                return
+            if mtime == self._loaded_mtime:
+                return
+
+            try:
+                with open(self.calibration_path, "r") as f:
+                    self._samples = json.load(f).get("samples", [])
+                self._loaded_mtime = mtime
+                self._fit()
+            except Exception as e:
+                self.logger.warning(f"Could not read duration calibration {self.calibration_path}: {e}")
+
+    def _fit(self):
+        """Fit the per-feature coefficients to past (features, actual duration) samples"""
+        if len(self._samples) < self.min_samples:
+            self._coefficients = list(self.default_coefficients)
+            return
+
+        features = np.array([s["features"] for s in self._samples], dtype=np.float64)
+        durations = np.array([s["duration"] for s in self._samples], dtype=np.float64)
+        coefficients, *_ = np.linalg.lstsq(features, durations, rcond=None)
+
+        if np.all(coefficients > 0):
+            self._coefficients = coefficients.tolist()
+        else:
+            # Too few or too similar runs for a stable fit: just rescale the defaults
+            predicted = features @ np.array(self.default_coefficients)
+            scale = float(predicted @ durations / (predicted @ predicted))
+            self._coefficients = [c * scale for c in self.default_coefficients]
+
+    @staticmethod
+    def count_syllables(word):
+        """Approximate the number of syllables in an English word"""
+        word = re.sub(r"[^a-z]", "", word.lower())
+        if not word:
+            # Numbers and symbols are read out, roughly two syllables per character group
+            return 2
+        groups = re.findall(r"[aeiouy]+", word)
+        count = len(groups)
+        if word.endswith("e") and not word.endswith(("le", "ee")) and count > 1:
+            count -= 1
+        return max(count, 1)
+
+    @staticmethod
+    def emotion_rate(emotion):
+        """Speaking rate multiplier that TTS applies for the emotion's prosody"""
+        rate = EMOTION_SETTINGS.get((emotion or "").lower(), {}).get("rate", "1.0")
+        if rate.endswith("%"):
+            return float(rate[:-1]) / 100.0
+        return float(rate)
+
+    def _features(self, text, emotion):
+        """Syllables, short pauses and sentence ends, each divided by the prosody rate"""
+        rate = self.emotion_rate(emotion)
+        syllables = sum(self.count_syllables(w) for w in text.split())
+        short_pauses = len(re.findall(r"[,;:–—]|\s-\s", text))
+        sentence_ends = max(len(re.findall(r"[.!?]+(?:\s|$)", text)), 1)
+        return [syllables / rate, short_pauses / rate, sentence_ends / rate]
+
+    def estimate(self, text, emotion=None):
+        """
+        Predict how long TTS will take to read the narration
+
+        Args:
+            text (str): Narration text
+            emotion (str, optional): Emotion whose prosody rate will be applied
+
+        Returns:
+            float: Estimated duration in seconds
+        """
+        if not text or not text.strip():
+            return 0.0
+        self._reload()
+        return float(np.dot(self._features(text, emotion), self._coefficients))
+
+    def record(self, text, emotion, actual_duration):
+        """
+        Add a synthesised narration's real duration to the calibration set
+
+        Args:
+            text (str): Narration text that was synthesised
+            emotion (str): Emotion used for synthesis
+            actual_duration (float): Duration of the generated audio in seconds
+        """
+        if not text or not actual_duration:
+            return
+        with self._lock:
+            self._reload()
+
+            predicted = self.estimate(text, emotion)
+            self._samples.append({"features": self._features(text, emotion), "duration": actual_duration})
+            self._samples = self._samples[-self.max_samples:]
+            self._fit()
+            self.logger.info(f"Narration duration: predicted {predicted:.1f}s, actual {actual_duration:.1f}s")
+
+            # Write beside the file and swap it in, so a concurrent reader never sees it half-written
+            temp_path = f"{self.calibration_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.calibration_path), exist_ok=True)
+                with open(temp_path, "w") as f:
+                    json.dump({"samples": self._samples}, f)
+                os.replace(temp_path, self.calibration_path)
+                self._loaded_mtime = os.path.getmtime(self.calibration_path)
+            except Exception as e:
+                self.logger.warning(f"Could not write duration calibration {self.calibration_path}: {e}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    def trim_to_duration(self, text, emotion, max_seconds):
+        """
+        Drop whole sentences until the narration fits the target length
+
+        The opening hook and the closing outro are kept; sentences are removed from the
+        end of the body first.
+
+        Args:
+            text (str): Narration text
+            emotion (str): Emotion whose prosody rate will be applied
+            max_seconds (float): Maximum allowed duration
+
+        Returns:
+            tuple: (narration text, estimated seconds, list of dropped sentences)
+        """
+        sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', text.strip()) if s.strip()]
+        dropped = []
+
+        while len(sentences) > 2 and self.estimate(" ".join(sentences), emotion) > max_seconds:
+            dropped.insert(0, sentences.pop(-2))
+
+        narration = " ".join(sentences)
+        return narration, self.estimate(narration, emotion), dropped
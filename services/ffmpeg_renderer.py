@@ -0,0 +1,150 @@
+#services/ffmpeg_renderer.py
+from PIL import Image
+from services.motion_renderer import source_geometry
+from utils.ffmpeg import run_ffmpeg, video_encoder_args, audio_encoder_args, rendition_graph
+from utils.logger import Logger
+
+class FFmpegRenderer:
+    """
+    Renders a VideoEditor timeline in a single ffmpeg invocation
+
+    Each image becomes a scale/crop/zoompan chain with the same geometry as
+    MotionRenderer, the segments are concatenated, and the narration is mixed with
+    the looped music bed, so no frame passes through Python.
+    """
+
+    def __init__(self):
+        self.logger = Logger(__name__)
+        self.supersample = 2  # zoompan positions are whole pixels; render the crop on a larger grid to avoid jitter
+
+    def _segment_filter(self, input_index, segment, fps, frame_size):
+        """Build the filter chain that turns one still image into its animated segment"""
+        with Image.open(segment["image_path"]) as img:
+            image_size = img.size
+
+        effect = segment["effect"]
+        scaled, region = source_geometry(image_size, effect, frame_size)
+        k = self.supersample
+        frames = max(int(round(segment["duration"] * fps)), 1)
+        steps = max(frames - 1, 1)
+
+        zoom = f"{effect['zoom_start']}+({effect['zoom_end'] - effect['zoom_start']})*on/{steps}"
+        pan_x = f"{effect['pan_start'][0]}+({effect['pan_end'][0] - effect['pan_start'][0]})*on/{steps}"
+        pan_y = f"{effect['pan_start'][1]}+({effect['pan_end'][1] - effect['pan_start'][1]})*on/{steps}"
+
+        return (
+            f"[{input_index}:v]scale={scaled[0] * k}:{scaled[1] * k}:flags=lanczos,"
+            f"crop={region[0] * k}:{region[1] * k},"
+            f"zoompan=z='{zoom}':x='(iw-iw/zoom)/2*(1+{pan_x})':y='(ih-ih/zoom)/2*(1+{pan_y})'"
+            f":d={frames}:s={frame_size[0]}x{frame_size[1]}:fps={fps},"
+            f"setsar=1,format=yuv420p[v{input_index}]"
+        )
+
+    def audio_mix(self, timeline, first_input_index):
+        """
+        Inputs and filters that mix the narration with the looped music bed into [aout]
+
+        Args:
+            timeline (dict): Timeline from VideoEditor.build_timeline
+            first_input_index (int): ffmpeg input index the audio inputs will start at
+
+        Returns:
+            tuple: (input arguments, list of filter chains)
+        """
+        narration_index = first_input_index
+        args = ["-i", timeline["audio_path"]]
+        filters = [f"[{narration_index}:a]aformat=sample_rates=44100:channel_layouts=stereo[narration]"]
+
+        # The music bed is looped by the demuxer and trimmed to the narration
+        if timeline.get("bg_music_path"):
+            args += ["-stream_loop", "-1", "-i", timeline["bg_music_path"]]
+            filters.append(
+                f"[{narration_index + 1}:a]volume={timeline['bg_volume']},"
+                f"aformat=sample_rates=44100:channel_layouts=stereo,atrim=0:{timeline['duration']:.3f}[bed]"
+            )
+            filters.append("[narration][bed]amix=inputs=2:duration=first:dropout_transition=0:normalize=0[aout]")
+        else:
+            filters.append("[narration]anull[aout]")
+
+        return args, filters
+
+    def render_audio(self, timeline, output_path):
+        """Render only the mixed soundtrack of a timeline to an AAC file"""
+        args, filters = self.audio_mix(timeline, 0)
+        run_ffmpeg(args + [
+            "-filter_complex", ";".join(filters), "-map", "[aout]",
+            *audio_encoder_args(timeline["profile"]), "-t", f"{timeline['duration']:.3f}", output_path
+        ])
+        return output_path
+
+    def build_command(self, timeline, output_path, encoder_args=None, renditions=None):
+        """
+        Translate a timeline into ffmpeg arguments
+
+        Args:
+            timeline (dict): Timeline from VideoEditor.build_timeline
+            output_path (str): Path of the video to write
+            encoder_args (list, optional): Video encoder arguments; defaults to the timeline's render profile
+            renditions (list, optional): Dicts with path, frame_size, fps, encoder_args and audio_args of
+                extra outputs, split from the composed frames inside the same graph
+
+        Returns:
+            list: Arguments for run_ffmpeg
+        """
+        fps = timeline["fps"]
+        frame_size = tuple(timeline["frame_size"])
+        segments = timeline["segments"]
+
+        args = []
+        filters = []
+        for i, segment in enumerate(segments):
+            args += ["-i", segment["image_path"]]
+            filters.append(self._segment_filter(i, segment, fps, frame_size))
+
+        labels = "".join(f"[v{i}]" for i in range(len(segments)))
+        filters.append(f"{labels}concat=n={len(segments)}:v=1:a=0[vout]")
+
+        audio_args, audio_filters = self.audio_mix(timeline, len(segments))
+        args += audio_args
+        filters += audio_filters
+
+        duration = ["-t", f"{timeline['duration']:.3f}"]
+        if not renditions:
+            args += ["-filter_complex", ";".join(filters), "-map", "[vout]", "-map", "[aout]"]
+            args += encoder_args or video_encoder_args(timeline["profile"])
+            args += [*audio_encoder_args(timeline["profile"]), *duration, output_path]
+            return args
+
+        # Every output is encoded from the one composed stream, split after compositing. The
+        # stream is put back on the exact frame grid first: zoompan's timestamps drift slightly,
+        # and the fps filter in each branch would otherwise drop the last frame
+        outputs = [{"frame_size": frame_size, "fps": fps}] + list(renditions)
+        graph, labels = rendition_graph("vgrid", outputs)
+        filters.append(f"[vout]setpts=N/{fps}/TB[vgrid]")
+        filters.append(graph)
+        filters.append(f"[aout]asplit={len(outputs)}" + "".join(f"[{label}a]" for label in labels))
+        args += ["-filter_complex", ";".join(filters)]
+        args += ["-map", f"[{labels[0]}]", "-map", f"[{labels[0]}a]",
+                 *(encoder_args or video_encoder_args(timeline["profile"])),
+                 *audio_encoder_args(timeline["profile"]), *duration, output_path]
+        for label, rendition in zip(labels[1:], renditions):
+            args += ["-map", f"[{label}]", "-map", f"[{label}a]", *rendition["encoder_args"], *rendition["audio_args"],
+                     *duration, rendition["path"]]
+        return args
+
+    def render(self, timeline, output_path, encoder_args=None, renditions=None):
+        """
+        Render a timeline to a video file
+
+        Args:
+            timeline (dict): Timeline from VideoEditor.build_timeline
+            output_path (str): Path of the video to write
+            encoder_args (list, optional): Video encoder arguments; defaults to the timeline's render profile
+            renditions (list, optional): Extra outputs encoded from the same composed frames (see build_command)
+
+        Returns:
+            str: Path to the generated video file
+        """
+        self.logger.info(f"Rendering {len(timeline['segments'])} segments with ffmpeg to {output_path}")
+        run_ffmpeg(self.build_command(timeline, output_path, encoder_args, renditions))
+        return output_path
@@ -0,0 +1,122 @@
+#services/frame_writer.py
+import queue
+import subprocess
+import threading
+import numpy as np
+from utils.ffmpeg import get_ffmpeg_binary, rendition_graph
+
+class FrameStreamWriter:
+    """
+    Streams raw RGB frames to an ffmpeg encoder through a fixed ring of buffers
+
+    The producer fills a preallocated buffer from acquire() and hands it back with
+    submit(); a writer thread passes it to ffmpeg's stdin as a memoryview and returns
+    it to the free list. Peak memory is ring_size frames regardless of video length.
+    Extra renditions are split from the same frames inside ffmpeg and scaled and
+    encoded alongside the main output.
+
+    Usage:
+        with FrameStreamWriter(path, (w, h), fps, encoder_args) as writer:
+            buffer = writer.acquire()
+            ...fill buffer...
+            writer.submit(buffer)
+    """
+
+    def __init__(self, output_path, frame_size, fps, encoder_args, audio_path=None, audio_args=None, ring_size=4,
+                 renditions=None):
+        self.output_path = output_path
+        self.frame_width, self.frame_height = frame_size
+        self.frame_count = 0
+
+        self._buffers = [np.empty((self.frame_height, self.frame_width, 3), dtype=np.uint8) for _ in range(ring_size)]
+        self._free = queue.Queue()
+        self._filled = queue.Queue()
+        for index in range(ring_size):
+            self._free.put(index)
+        self._by_id = {id(buffer): index for index, buffer in enumerate(self._buffers)}
+        self._error = None
+
+        command = [
+            get_ffmpeg_binary(), "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{self.frame_width}x{self.frame_height}",
+            "-r", str(fps), "-i", "-"
+        ]
+        if audio_path:
+            command += ["-i", audio_path]
+        # Audio is encoded here from uncompressed input: stream-copying a pre-encoded AAC track
+        # together with -shortest ends the output on the AAC packet grid and loses the last frame
+        audio = ["-map", "1:a", *(audio_args or ["-c:a", "aac"])] if audio_path else ["-an"]
+
+        if renditions:
+            # Each rendition: dict with path, frame_size, fps, encoder_args and audio_args; encoder_args
+            # must come from video_encoder_args so the output shares the timescale bumpers are joined at
+            outputs = [{"frame_size": frame_size, "fps": fps}] + list(renditions)
+            graph, labels = rendition_graph("0:v", outputs)
+            command += ["-filter_complex", graph, "-map", f"[{labels[0]}]", *audio, *encoder_args, output_path]
+            for label, rendition in zip(labels[1:], renditions):
+                rendition_audio = ["-map", "1:a", *rendition["audio_args"]] if audio_path else ["-an"]
+                command += ["-map", f"[{label}]", *rendition_audio, *rendition["encoder_args"], rendition["path"]]
+        else:
+            command += ["-map", "0:v", *audio, *encoder_args, output_path]
+
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        """Write filled buffers to ffmpeg in order and recycle them"""
+        while True:
+            index = self._filled.get()
+            if index is None:
+                break
+            try:
+                if self._error is None:
+                    view = memoryview(self._buffers[index]).cast("B")
+                    while view:
+                        written = self._process.stdin.write(view)
+                        view = view[written:]
+            except (BrokenPipeError, OSError) as e:
+                self._error = e
+            finally:
+                self._free.put(index)
+
+    def acquire(self):
+        """Return a free frame buffer (HxWx3 uint8), blocking while all buffers are in flight"""
+        if self._error is not None:
+            raise RuntimeError(f"ffmpeg stopped accepting frames for {self.output_path}: {self._error}")
+        return self._buffers[self._free.get()]
+
+    def submit(self, buffer):
+        """Queue a filled buffer from acquire() for encoding"""
+        self._filled.put(self._by_id[id(buffer)])
+        self.frame_count += 1
+
+    def close(self):
+        """Flush the remaining frames, close ffmpeg's input and wait for the encoder to finish"""
+        self._filled.put(None)
+        self._thread.join()
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = self._process.stderr.read().decode("utf-8", errors="replace").strip()
+        if self._process.wait() != 0 or self._error is not None:
+            raise RuntimeError(f"ffmpeg failed to encode {self.output_path}: {stderr or self._error}")
+        return self.output_path
+
+    def abort(self):
+        """Stop the encoder without waiting for pending frames"""
+        self._filled.put(None)
+        self._process.kill()
+        self._thread.join()
+        self._process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -3,6 +3,8 @@ import time
 import requests
 import re
 from config import settings
+from services.image_hasher import ImageHasher
+from services.title_card_generator import TitleCardGenerator
 from utils.logger import Logger
 
 class ImageGenerator:
@@ -13,6 +15,14 @@ class ImageGenerator:
         self.model = 'stable-diffusion'  # Default model
         self.max_retries = 5  # Maximum number of retry attempts
         self.retry_delay = 2  # Seconds to wait between retries
+        self.source = settings.IMAGE_SOURCE
+        self.fallback = settings.IMAGE_FALLBACK
+        self.deadline = settings.IMAGE_FALLBACK_DEADLINE  # Seconds allowed per image before falling back
+        self.connect_timeout = 5  # Seconds to reach the provider, within the deadline
+        self.chunk_size = 8 * 1024  # Bytes per read; the deadline is checked after each one
+        self.title_cards = TitleCardGenerator(self.width, self.height)
+        self.max_dedup_rounds = settings.IMAGE_DEDUP_MAX_ROUNDS
+        self.hasher = ImageHasher()
     
     def _sanitize_prompt(self, prompt):
         """Clean prompt for use in URL and filename"""
@@ -21,14 +31,19 @@ class ImageGenerator:
         # Limit length and replace spaces with underscores
         return safe_prompt[:50].strip().replace(' ', '_').lower()
     
-    def _download_image(self, prompt, seed, attempt=1):
+    def _download_image(self, prompt, seed, attempt=1, deadline=None):
         """
         Download a single image with retry logic
         
+        The deadline covers connecting, waiting for the provider and streaming the body. The
+        read timeout bounds each wait for data and the elapsed time is checked between chunks,
+        so a body that trickles in slowly is abandoned at the deadline.
+        
         Args:
             prompt (str): The image prompt
             seed (int): The seed for image generation
             attempt (int): Current attempt number
+            deadline (float, optional): time.monotonic() value by which the download must finish
             
         Returns:
             tuple: (success_flag, output_path)
@@ -36,6 +51,7 @@ class ImageGenerator:
         # Create a filename based on the prompt
         safe_filename = f"{self._sanitize_prompt(prompt)}_{seed}.jpg"
         output_path = os.path.join(settings.IMAGES_DIR, safe_filename)
+        temp_path = f"{output_path}.part"
         
         # Generate the image URL
         image_url = f"https://image.pollinations.ai/prompt/{prompt}?width={self.width}&height={self.height}&seed={seed}&nologo=true&nofeed=true&model={self.model}"
@@ -43,63 +59,146 @@ class ImageGenerator:
         self.logger.info(f"Downloading image (attempt {attempt}/{self.max_retries}): {prompt[:30]}...")
         
         try:
-            # Download the image
-            response = requests.get(image_url)
-            
-            if response.status_code == 200:
-                # Write the content to file
-                with open(output_path, 'wb') as file:
-                    file.write(response.content)
+            timeout = None
+            if deadline:
+                # The provider only answers once the image is generated, so the first byte may take the whole budget
+                remaining = max(deadline - time.monotonic(), 1)
+                timeout = (min(self.connect_timeout, remaining), remaining)
+            with requests.get(image_url, timeout=timeout, stream=True) as response:
+                if response.status_code != 200:
+                    self.logger.warning(f"Failed to download image. Status code: {response.status_code}")
+                    return False, None
                 
-                self.logger.info(f"Downloaded image to {output_path}")
-                return True, output_path
-            else:
-                self.logger.warning(f"Failed to download image. Status code: {response.status_code}")
-                return False, None
+                with open(temp_path, 'wb') as file:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if deadline and time.monotonic() > deadline:
+                            raise TimeoutError("image download passed its deadline")
+                        file.write(chunk)
+            
+            os.replace(temp_path, output_path)
+            self.logger.info(f"Downloaded image to {output_path}")
+            return True, output_path
         
         except Exception as e:
             self.logger.warning(f"Error downloading image: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
             return False, None
     
-    def generate_images(self, image_prompts):
+    def _fallback_image(self, caption, seed, frame_size=None):
+        """Return the configured fallback image for a prompt that could not be generated"""
+        if self.fallback == "title_card" and caption:
+            try:
+                width, height = frame_size or (self.width, self.height)
+                output_path = os.path.join(settings.IMAGES_DIR,
+                                           f"card_{self._sanitize_prompt(caption)}_{seed}_{width}x{height}.jpg")
+                return self.title_cards.generate_card(caption, output_path, (width, height))
+            except Exception as e:
+                self.logger.warning(f"Error rendering title card: {e}")
+        return settings.PLACEHOLDER_IMAGE_PATH
+    
+    def _generate_image(self, prompt, seed, caption=None, frame_size=None):
         """
-        Generate images from prompts using Pollinations.ai
+        Generate a single image, retrying with backoff until the latency deadline
+        
+        Args:
+            prompt (str): The image prompt
+            seed (int): The seed for image generation
+            caption (str, optional): Text for a title card if the provider fails
+            frame_size (tuple, optional): (width, height) to render title cards at
+            
+        Returns:
+            str: Path to the generated image (or the fallback image)
+        """
+        if self.source == "title_card":
+            return self._fallback_image(caption or prompt, seed, frame_size)
+        
+        started = time.monotonic()
+        for attempt in range(1, self.max_retries + 1):
+            success, output_path = self._download_image(prompt, seed, attempt, deadline=started + self.deadline)
+            
+            if success:
+                return output_path
+            
+            if attempt < self.max_retries:
+                retry_wait = self.retry_delay * attempt  # Increasing backoff
+                if time.monotonic() - started + retry_wait >= self.deadline:
+                    self.logger.warning(f"Image deadline of {self.deadline}s reached after {attempt} attempts")
+                    break
+                self.logger.info(f"Retrying in {retry_wait} seconds...")
+                time.sleep(retry_wait)
+        
+        self.logger.error(f"Failed to generate image for prompt: {prompt[:30]}... Using {self.fallback} fallback.")
+        return self._fallback_image(caption, seed, frame_size)
+    
+    @staticmethod
+    def _fallback_paths(image_paths):
+        """
+        Placeholders and title cards among the images, which dedup leaves alone
+
+        Both depend only on the caption, not the seed, so regenerating them would give the same image.
+        """
+        return {path for path in image_paths
+                if path == settings.PLACEHOLDER_IMAGE_PATH or os.path.basename(path or "").startswith("card_")}
+    
+    def _regenerate_duplicates(self, image_prompts, image_paths, captions, frame_size=None):
+        """
+        Replace near-duplicate images with new generations using a different seed
+        
+        Args:
+            image_prompts (list): List of image prompts
+            image_paths (list): Paths to the generated images (updated in place)
+            captions (list): Title card text for each prompt
+            frame_size (tuple, optional): (width, height) to render title cards at
+            
+        Returns:
+            list: Paths to the deduplicated image files
+        """
+        for dedup_round in range(1, self.max_dedup_rounds + 1):
+            duplicates = self.hasher.find_duplicates(image_paths, ignore_paths=self._fallback_paths(image_paths))
+            if not duplicates:
+                break
+            
+            self.logger.info(f"Regenerating {len(duplicates)} near-duplicate images (round {dedup_round})")
+            for i in duplicates:
+                old_path = image_paths[i]
+                seed = 42 + i + dedup_round * 1000  # New seed also bypasses the provider's cache
+                image_paths[i] = self._generate_image(image_prompts[i], seed, captions[i], frame_size)
+                
+                if old_path not in image_paths and os.path.exists(old_path):
+                    os.remove(old_path)
+        else:
+            remaining = self.hasher.find_duplicates(image_paths, ignore_paths=self._fallback_paths(image_paths))
+            if remaining:
+                self.logger.warning(f"{len(remaining)} images are still near-duplicates after {self.max_dedup_rounds} rounds")
+        
+        self.hasher.save()
+        return image_paths
+    
+    def generate_images(self, image_prompts, captions=None, frame_size=None):
+        """
+        Generate images from prompts using Pollinations.ai, or local title cards
         
         Args:
             image_prompts (list): List of image prompts
+            captions (list, optional): Headline/key-point text per prompt, used for title cards
+            frame_size (tuple, optional): (width, height) of the render profile, so title cards fill the frame
             
         Returns:
             list: Paths to the generated image files
         """
-        self.logger.info(f"Generating {len(image_prompts)} images")
+        self.logger.info(f"Generating {len(image_prompts)} images (source: {self.source})")
+        captions = list(captions or [])
+        captions += [None] * (len(image_prompts) - len(captions))
         image_paths = []
         
         for i, prompt in enumerate(image_prompts):
             # Create a seed that varies for each prompt
             seed = 42 + i
-            
-            # Try to download the image with retries
-            success = False
-            output_path = None
-            
-            for attempt in range(1, self.max_retries + 1):
-                success, output_path = self._download_image(prompt, seed, attempt)
-                
-                if success:
-                    break
-                
-                if attempt < self.max_retries:
-                    retry_wait = self.retry_delay * attempt  # Increasing backoff
-                    self.logger.info(f"Retrying in {retry_wait} seconds...")
-                    time.sleep(retry_wait)
-            
-            if success:
-                image_paths.append(output_path)
-            else:
-                self.logger.error(f"Failed to generate image after {self.max_retries} attempts. Using placeholder.")
-                image_paths.append(settings.PLACEHOLDER_IMAGE_PATH)
+            image_paths.append(self._generate_image(prompt, seed, captions[i], frame_size))
             
             # Add a small delay before processing the next prompt
-            time.sleep(1)
+            if self.source != "title_card":
+                time.sleep(1)
         
-        return image_paths
\ No newline at end of file
+        return self._regenerate_duplicates(image_prompts, image_paths, captions, frame_size)
\ No newline at end of file
@@ -0,0 +1,108 @@
+#services/image_hasher.py
+import os
+import json
+import numpy as np
+from PIL import Image
+from config import settings
+from utils.logger import Logger
+
+class ImageHasher:
+    def __init__(self, cache_path=None, hash_size=8):
+        self.logger = Logger(__name__)
+        self.hash_size = hash_size  # 8 -> 64-bit difference hash
+        self.cache_path = cache_path or settings.IMAGE_HASH_CACHE_PATH
+        self._cache = self._load_cache()
+        self._dirty = False
+
+    def _load_cache(self):
+        """Load previously computed hashes from disk"""
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, "r") as f:
+                    return json.load(f)
+            except Exception as e:
+                self.logger.warning(f"Could not read image hash cache {self.cache_path}: {e}")
+        return {}
+
+    def save(self):
+        """Persist the hash cache if anything new was computed"""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "w") as f:
+                json.dump(self._cache, f)
+            self._dirty = False
+        except Exception as e:
+            self.logger.warning(f"Could not write image hash cache {self.cache_path}: {e}")
+
+    def _cache_key(self, image_path):
+        """Key a file by path, size and modification time so rewritten files are rehashed"""
+        stat = os.stat(image_path)
+        return f"{os.path.abspath(image_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def dhash(self, image_path):
+        """
+        Compute the difference hash (dHash) of an image
+
+        Args:
+            image_path (str): Path to the image file
+
+        Returns:
+            str: Hash as a hex string
+        """
+        key = self._cache_key(image_path)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        with Image.open(image_path) as img:
+            gray = img.convert("L").resize((self.hash_size + 1, self.hash_size), Image.LANCZOS)
+
+        # Each bit records whether a pixel is brighter than its right-hand neighbour
+        pixels = np.asarray(gray, dtype=np.int16)
+        bits = pixels[:, 1:] > pixels[:, :-1]
+        value = np.packbits(bits.flatten()).tobytes().hex()
+
+        self._cache[key] = value
+        self._dirty = True
+        return value
+
+    @staticmethod
+    def hamming_distance(hash_a, hash_b):
+        """Number of differing bits between two hex hashes"""
+        return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+    def find_duplicates(self, image_paths, threshold=None, ignore_paths=None):
+        """
+        Find images that are near-duplicates of an earlier image in the list
+
+        Args:
+            image_paths (list): Paths to the image files, in video order
+            threshold (int, optional): Maximum Hamming distance counted as a duplicate
+            ignore_paths (set, optional): Paths that are never reported (e.g. placeholders)
+
+        Returns:
+            list: Indexes of the images that should be regenerated
+        """
+        if threshold is None:
+            threshold = settings.IMAGE_DEDUP_THRESHOLD
+        ignore_paths = ignore_paths or set()
+
+        duplicates = []
+        kept_hashes = []
+        for i, path in enumerate(image_paths):
+            if not path or path in ignore_paths or not os.path.exists(path):
+                continue
+            try:
+                image_hash = self.dhash(path)
+            except Exception as e:
+                self.logger.warning(f"Could not hash image {path}: {e}")
+                continue
+
+            if any(self.hamming_distance(image_hash, kept) <= threshold for kept in kept_hashes):
+                duplicates.append(i)
+            else:
+                kept_hashes.append(image_hash)
+
+        return duplicates
@@ -0,0 +1,177 @@
+#services/motion_renderer.py
+import random
+import numpy as np
+from PIL import Image
+
+# Slideshow effects; pan positions are fractions of the free space on each axis (-1..1)
+EFFECT_TYPES = ['zoom', 'pan', 'zoom_out', 'pan_zoom']
+PAN_ZOOM = 2200 / 1920  # Pans crop into a slightly enlarged image
+
+def choose_effect(rng=random):
+    """
+    Pick the motion parameters for one image segment
+
+    Args:
+        rng (random.Random, optional): Random source, seed it for reproducible segments
+
+    Returns:
+        dict: Effect type, start/end zoom and start/end pan position
+    """
+    effect_type = rng.choice(EFFECT_TYPES)
+
+    if effect_type == 'zoom':
+        # Gradual zoom in effect
+        return {"type": effect_type, "zoom_start": 1.0, "zoom_end": rng.uniform(1.05, 1.2),
+                "pan_start": [0.0, 0.0], "pan_end": [0.0, 0.0]}
+
+    if effect_type == 'zoom_out':
+        # Zoom out effect
+        return {"type": effect_type, "zoom_start": rng.uniform(1.1, 1.3), "zoom_end": 1.0,
+                "pan_start": [0.0, 0.0], "pan_end": [0.0, 0.0]}
+
+    if effect_type == 'pan':
+        # Pan effect (left to right, right to left, top to bottom, or bottom to top)
+        direction = rng.choice(['left_to_right', 'right_to_left', 'top_to_bottom', 'bottom_to_top'])
+        pan_start, pan_end = {
+            'left_to_right': ([-1.0, 0.0], [1.0, 0.0]),
+            'right_to_left': ([1.0, 0.0], [-1.0, 0.0]),
+            'top_to_bottom': ([0.0, -1.0], [0.0, 1.0]),
+            'bottom_to_top': ([0.0, 1.0], [0.0, -1.0]),
+        }[direction]
+        return {"type": effect_type, "zoom_start": PAN_ZOOM, "zoom_end": PAN_ZOOM,
+                "pan_start": pan_start, "pan_end": pan_end}
+
+    # pan_zoom combination: zoom in while drifting towards a corner
+    return {"type": effect_type, "zoom_start": 1.0, "zoom_end": rng.uniform(1.05, 1.15),
+            "pan_start": [0.0, 0.0], "pan_end": [rng.choice([-0.8, 0.8]), rng.choice([-0.4, 0.4])]}
+
+def source_geometry(image_size, effect, frame_size):
+    """
+    Size of the scaled source and of the frame-shaped region that the effect moves within
+
+    The image is scaled to cover the frame at the effect's maximum zoom and the centred
+    region with the frame's aspect ratio is kept, so a crop of region/zoom always has
+    the frame's shape. Every renderer derives its geometry from this.
+
+    Args:
+        image_size (tuple): (width, height) of the original image
+        effect (dict): Motion parameters from choose_effect
+        frame_size (tuple): (width, height) of the output frame
+
+    Returns:
+        tuple: ((scaled width, scaled height), (region width, region height))
+    """
+    frame_width, frame_height = frame_size
+    max_zoom = max(effect["zoom_start"], effect["zoom_end"], 1.0)
+    region = (int(np.ceil(frame_width * max_zoom)), int(np.ceil(frame_height * max_zoom)))
+    cover = max(region[0] / image_size[0], region[1] / image_size[1])
+    scaled = (max(int(np.ceil(image_size[0] * cover)), region[0]), max(int(np.ceil(image_size[1] * cover)), region[1]))
+    return scaled, region
+
+def effect_at(effect, progress):
+    """Zoom and pan position at the given progress (0..1 scalar or array) through a segment"""
+    zoom = effect["zoom_start"] + (effect["zoom_end"] - effect["zoom_start"]) * progress
+    pan_x = effect["pan_start"][0] + (effect["pan_end"][0] - effect["pan_start"][0]) * progress
+    pan_y = effect["pan_start"][1] + (effect["pan_end"][1] - effect["pan_start"][1]) * progress
+    return zoom, pan_x, pan_y
+
+class MotionRenderer:
+    """
+    Renders a Ken Burns segment from one still image
+
+    The image is scaled once so that the most zoomed-in crop maps 1:1 onto the output
+    frame (see source_geometry). The crop rectangle of every frame is precomputed, and
+    each frame is one crop + bilinear resample in Pillow, copied into a reused output buffer.
+    """
+
+    def __init__(self, image, effect, duration, fps, frame_size):
+        self.effect = effect
+        self.fps = fps
+        self.frame_width, self.frame_height = frame_size
+        self.frame_count = max(int(round(duration * fps)), 1)
+        self.duration = self.frame_count / fps
+
+        self.source = self._prescale(image)
+        self.boxes = self._crop_boxes()
+        self._buffer = np.empty((self.frame_height, self.frame_width, 3), dtype=np.uint8)
+
+    def _prescale(self, image):
+        """Scale the image to cover the frame at the effect's maximum zoom and crop the frame-shaped region"""
+        if isinstance(image, str):
+            with Image.open(image) as img:
+                image = img.convert("RGB")
+        elif isinstance(image, np.ndarray):
+            image = Image.fromarray(image).convert("RGB")
+
+        scaled, region = source_geometry(image.size, self.effect, (self.frame_width, self.frame_height))
+        left = (scaled[0] - region[0]) // 2
+        top = (scaled[1] - region[1]) // 2
+        return image.resize(scaled, Image.LANCZOS).crop((left, top, left + region[0], top + region[1]))
+
+    def _crop_boxes(self):
+        """Compute the (left, top, right, bottom) source rectangle of every frame"""
+        progress = np.linspace(0.0, 1.0, self.frame_count) if self.frame_count > 1 else np.zeros(1)
+        zoom, pan_x, pan_y = effect_at(self.effect, progress)
+
+        region_w, region_h = self.source.size
+        crop_w = region_w / zoom
+        crop_h = region_h / zoom
+        left = (region_w - crop_w) / 2 * (1 + pan_x)
+        top = (region_h - crop_h) / 2 * (1 + pan_y)
+
+        return np.stack([left, top, left + crop_w, top + crop_h], axis=1)
+
+    def frame_index(self, t):
+        """Frame number shown at time t (seconds from the start of the segment)"""
+        return min(max(int(t * self.fps + 1e-6), 0), self.frame_count - 1)
+
+    def render_frame(self, index, out=None):
+        """
+        Render one frame into a buffer
+
+        Args:
+            index (int): Frame number within the segment
+            out (numpy.ndarray, optional): HxWx3 uint8 buffer to write into; defaults to the reused buffer
+
+        Returns:
+            numpy.ndarray: The frame
+        """
+        out = self._buffer if out is None else out
+        box = tuple(float(v) for v in self.boxes[index])
+        resized = self.source.resize((self.frame_width, self.frame_height), Image.BILINEAR, box=box, reducing_gap=None)
+        np.copyto(out, np.asarray(resized))
+        return out
+
+    def make_frame(self, t):
+        """MoviePy-compatible frame function"""
+        return self.render_frame(self.frame_index(t))
+
+if __name__ == "__main__":
+    # Benchmark against the MoviePy resize-lambda effects:  python -m services.motion_renderer IMAGE
+    import sys
+    import time
+
+    image_path = sys.argv[1] if len(sys.argv) > 1 else "assets/placeholder.png"
+    duration, fps, frame_size = 4.0, 24, (1080, 1920)
+
+    from services.video_editor import VideoEditor
+    editor = VideoEditor()
+
+    for effect_type in EFFECT_TYPES:
+        rng = random.Random(0)
+        effect = choose_effect(rng)
+        while effect["type"] != effect_type:
+            effect = choose_effect(rng)
+
+        started = time.perf_counter()
+        renderer = MotionRenderer(image_path, effect, duration, fps, frame_size)
+        frames = [renderer.make_frame(i / fps).copy() for i in range(renderer.frame_count)]
+        numpy_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        legacy = editor._create_moviepy_clip(image_path, duration, effect)
+        legacy_frames = [legacy.get_frame(i / fps) for i in range(int(duration * fps))]
+        legacy_time = time.perf_counter() - started
+
+        print(f"{effect_type:9s} numpy: {len(frames)} frames {frames[0].shape} in {numpy_time:.2f}s | "
+              f"moviepy: {len(legacy_frames)} frames {legacy_frames[0].shape} in {legacy_time:.2f}s")
@@ -0,0 +1,232 @@
+#services/segment_renderer.py
+import os
+import json
+import shutil
+import hashlib
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from config import settings
+from services.ffmpeg_renderer import FFmpegRenderer
+from services.frame_writer import FrameStreamWriter
+from services.caption_renderer import CaptionRenderer
+from services.motion_renderer import MotionRenderer
+from utils.ffmpeg import run_ffmpeg, video_encoder_args
+from utils.logger import Logger
+
+def render_segment(segment, fps, frame_size, output_path, encoder_args, words=None, renditions=None):
+    """
+    Encode one timeline segment to its own video-only file
+
+    Runs in a worker process: frames come from MotionRenderer and are streamed to ffmpeg
+    through a FrameStreamWriter. All segments share encoder_args, so they can be joined
+    without re-encoding.
+
+    Args:
+        segment (dict): Timeline segment (image_path, duration, effect)
+        fps (int): Frames per second
+        frame_size (tuple): (width, height) of the output frame
+        output_path (str): Path of the segment file to write
+        encoder_args (list): Video encoder arguments shared by every segment
+        words (list, optional): Word timings of the whole narration, burned in as captions
+        renditions (list, optional): Dicts with path, frame_size, fps and encoder_args of scaled
+            copies of the segment, split from the same frames by the same ffmpeg
+
+    Returns:
+        str: Path to the encoded segment
+    """
+    renderer = MotionRenderer(segment["image_path"], segment["effect"], segment["duration"], fps, frame_size)
+    captions = CaptionRenderer(words, frame_size) if words else None
+    with FrameStreamWriter(output_path, frame_size, fps, encoder_args, renditions=renditions) as writer:
+        for index in range(renderer.frame_count):
+            frame = renderer.render_frame(index, out=writer.acquire())
+            if captions:
+                captions.apply(frame, segment["start"] + index / fps)
+            writer.submit(frame)
+    return output_path
+
+class SegmentRenderer:
+    """
+    Renders a timeline as independent segments in a process pool and joins them by stream copy
+
+    Every segment is encoded with identical codec parameters and starts on a keyframe,
+    so ffmpeg's concat demuxer can join them without re-encoding; the mixed soundtrack
+    is rendered once and muxed on at the end. Encoded segments are cached by their
+    content, so a re-render after an edit only encodes the segments that changed.
+    Renditions are encoded segment by segment from the same frames and joined the same way.
+    """
+
+    def __init__(self, workers=None, cache_dir=None):
+        self.logger = Logger(__name__)
+        self.workers = workers or settings.VIDEO_RENDER_WORKERS
+        self.cache_dir = cache_dir or settings.SEGMENT_CACHE_DIR
+        self.cache_max_bytes = settings.SEGMENT_CACHE_MAX_MB * 1024 * 1024
+        self.ffmpeg_renderer = FFmpegRenderer()
+        self._image_digests = {}  # (path, size, mtime) -> sha256 of the image file
+
+    def encoder_args(self, profile):
+        """Video encoder arguments shared by every segment"""
+        # Unless the profile pins it, split the host's cores between the frame workers and x264's own threads
+        threads = profile.get("threads") or max(1, (os.cpu_count() or 1) // self.workers)
+        return video_encoder_args(profile, threads=threads)
+
+    def _image_digest(self, image_path):
+        """Content hash of an image, cached while the file is unchanged"""
+        stat = os.stat(image_path)
+        key = (os.path.abspath(image_path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._image_digests:
+            with open(image_path, "rb") as f:
+                self._image_digests[key] = hashlib.sha256(f.read()).hexdigest()
+        return self._image_digests[key]
+
+    def segment_key(self, segment, profile, captions=None):
+        """
+        Cache key of an encoded segment
+
+        Args:
+            segment (dict): Timeline segment (image_path, duration, effect)
+            profile (dict): Render profile the segment is encoded with
+            captions (CaptionRenderer, optional): Captions burned into the video
+
+        Returns:
+            str: Hex digest of the image content, effect, frame count, captions and encoder settings
+        """
+        # Thread count is left out: it does not change what can be joined by stream copy
+        encoding = {k: v for k, v in profile.items() if k not in ("name", "threads", "audio_bitrate")}
+        payload = {
+            "image": self._image_digest(segment["image_path"]),
+            "effect": segment["effect"],
+            "frames": max(int(round(segment["duration"] * profile["fps"])), 1),
+            "profile": encoding,
+        }
+        if captions:
+            # Caption times are relative to the segment, so a segment moved in time can still be reused
+            shown = captions.visible(segment["start"], segment["start"] + segment["duration"])
+            payload["captions"] = {
+                "font": [captions.font_path, captions.font_size, captions.top],
+                "shown": [[c["text"], round(c["start"] - segment["start"], 4), round(c["end"] - segment["start"], 4)]
+                          for c in shown],
+            }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=list).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def rendition_key(segment_key, rendition_profile):
+        """Cache key of a rendition segment scaled from the segment with segment_key"""
+        encoding = {k: v for k, v in rendition_profile.items() if k not in ("name", "threads", "audio_bitrate")}
+        payload = {"segment": segment_key, "rendition": encoding}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=list).encode("utf-8")).hexdigest()
+
+    def _prune_cache(self, keep):
+        """Delete the least recently used segments once the cache exceeds its size limit"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".mp4") and path not in keep:
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries) + sum(os.path.getsize(p) for p in keep if os.path.exists(p))
+        for _, size, path in sorted(entries):
+            if total <= self.cache_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError as e:
+                self.logger.warning(f"Could not remove cached segment {path}: {e}")
+
+    def concat(self, segment_paths, audio_path, output_path, duration, work_dir):
+        """Join encoded segments with the concat demuxer and mux the soundtrack, without re-encoding"""
+        list_path = os.path.join(work_dir, "segments.txt")
+        with open(list_path, "w") as f:
+            for path in segment_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        args = ["-f", "concat", "-safe", "0", "-i", list_path]
+        if audio_path:
+            args += ["-i", audio_path, "-map", "0:v", "-map", "1:a"]
+        args += ["-c", "copy", "-t", f"{duration:.3f}", "-movflags", "+faststart", output_path]
+        run_ffmpeg(args)
+        return output_path
+
+    def render(self, timeline, output_path, renditions=None):
+        """
+        Render a timeline to a video file
+
+        Args:
+            timeline (dict): Timeline from VideoEditor.build_timeline
+            output_path (str): Path of the video to write
+            renditions (list, optional): Dicts with profile, path, frame_size and fps of extra outputs
+
+        Returns:
+            str: Path to the generated video file
+        """
+        fps = timeline["fps"]
+        frame_size = tuple(timeline["frame_size"])
+        profile = timeline["profile"]
+        work_dir = os.path.join(settings.TEMP_DIR, f"segments_{uuid.uuid4().hex}")
+        os.makedirs(work_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        encoder_args = self.encoder_args(profile)
+        words = timeline.get("words") or []
+        captions = CaptionRenderer(words, frame_size) if words else None
+
+        renditions = list(renditions or [])
+        rendition_args = [self.encoder_args(rendition["profile"]) for rendition in renditions]
+
+        # Cache paths of each segment: the main encode followed by one per rendition
+        segment_keys = [self.segment_key(segment, profile, captions) for segment in timeline["segments"]]
+        output_paths = [
+            [os.path.join(self.cache_dir, f"{key}.mp4")]
+            + [os.path.join(self.cache_dir, f"{self.rendition_key(key, rendition['profile'])}.mp4")
+               for rendition in renditions]
+            for key in segment_keys
+        ]
+        segment_paths = [paths[0] for paths in output_paths]
+        # Identical segments within one timeline are encoded once
+        missing = {
+            paths[0]: (segment, paths) for paths, segment in zip(output_paths, timeline["segments"])
+            if not all(os.path.exists(path) for path in paths)
+        }
+
+        started = time.time()
+        self.logger.info(
+            f"Rendering {len(missing)} of {len(segment_paths)} segments with {self.workers} workers "
+            f"({len(segment_paths) - len(missing)} from cache)"
+        )
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {}
+                for path, (segment, paths) in missing.items():
+                    work_paths = [os.path.join(work_dir, os.path.basename(p)) for p in paths]
+                    segment_renditions = [
+                        {"path": work_path, "frame_size": rendition["frame_size"], "fps": rendition["fps"],
+                         "encoder_args": args}
+                        for work_path, rendition, args in zip(work_paths[1:], renditions, rendition_args)
+                    ]
+                    future = executor.submit(render_segment, segment, fps, frame_size, work_paths[0], encoder_args,
+                                             words, segment_renditions)
+                    futures[path] = (future, list(zip(work_paths, paths)))
+                # The soundtrack is mixed while the segments encode
+                audio_path = self.ffmpeg_renderer.render_audio(timeline, os.path.join(work_dir, "audio.m4a"))
+                for future, moves in futures.values():
+                    future.result()
+                    # Only complete segments enter the cache
+                    for work_path, path in moves:
+                        os.replace(work_path, path)
+
+            all_paths = [path for paths in output_paths for path in paths]
+            for path in all_paths:
+                os.utime(path)  # Mark as recently used for pruning
+            self.concat(segment_paths, audio_path, output_path, timeline["duration"], work_dir)
+            for index, rendition in enumerate(renditions, start=1):
+                self.concat([paths[index] for paths in output_paths], audio_path, rendition["path"],
+                            timeline["duration"], work_dir)
+            self._prune_cache(set(all_paths))
+            self.logger.info(f"Rendered {len(segment_paths)} segments in {time.time() - started:.1f}s")
+            return output_path
+
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
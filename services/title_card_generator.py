@@ -0,0 +1,112 @@
+#services/title_card_generator.py
+import os
+import hashlib
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from config import settings
+from utils.logger import Logger
+
+class TitleCardGenerator:
+    def __init__(self, width=1024, height=1024):
+        self.logger = Logger(__name__)
+        self.width = width
+        self.height = height
+        self.font_path = settings.TITLE_CARD_FONT_PATH
+        # Pairs of (top, bottom) gradient colours, picked per card from the text hash
+        self.palettes = [
+            ((18, 32, 74), (94, 23, 97)),
+            ((10, 61, 78), (16, 130, 110)),
+            ((66, 16, 24), (190, 70, 40)),
+            ((24, 24, 28), (70, 84, 110)),
+            ((40, 20, 90), (20, 120, 170)),
+            ((12, 48, 30), (140, 150, 40)),
+        ]
+
+    def _gradient(self, top, bottom, tilt, width, height):
+        """Build a diagonal two-colour gradient as an RGB array"""
+        rows = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+        cols = np.linspace(-0.5, 0.5, width, dtype=np.float32)[None, :]
+        mix = np.clip(rows + tilt * cols, 0.0, 1.0)[..., None]
+
+        top = np.array(top, dtype=np.float32)
+        bottom = np.array(bottom, dtype=np.float32)
+        return (top + (bottom - top) * mix).astype(np.uint8)
+
+    def _load_font(self, size):
+        """Load the configured TrueType font, falling back to Pillow's default"""
+        try:
+            return ImageFont.truetype(self.font_path, size)
+        except (OSError, IOError):
+            return ImageFont.load_default(size)
+
+    def _wrap_text(self, draw, text, font, max_width):
+        """Greedy word wrap using measured text widths"""
+        lines = []
+        current = ""
+        for word in text.split():
+            candidate = f"{current} {word}".strip()
+            if current and draw.textlength(candidate, font=font) > max_width:
+                lines.append(current)
+                current = word
+            else:
+                current = candidate
+        if current:
+            lines.append(current)
+        return lines
+
+    def _fit_text(self, draw, text, width, height):
+        """Pick the largest font size whose wrapped text fits inside the margins"""
+        margin = int(min(width, height) * 0.08)
+        max_width = width - 2 * margin
+        max_height = height - 2 * margin
+
+        size = min(width, height) // 9
+        while True:
+            font = self._load_font(size)
+            lines = self._wrap_text(draw, text, font, max_width)
+            line_height = int(size * 1.25)
+            if len(lines) * line_height <= max_height or size <= 18:
+                return font, lines, line_height
+            size = int(size * 0.85)
+
+    def generate_card(self, text, output_path=None, frame_size=None):
+        """
+        Render a title card with the given text over a gradient background
+
+        Args:
+            text (str): Headline or key-point text to display
+            output_path (str, optional): Output file path. If None, a path is derived from the text.
+            frame_size (tuple, optional): (width, height) of the card, normally the render
+                profile's frame size so the card fills the frame; defaults to the generator's size
+
+        Returns:
+            str: Path to the generated image file
+        """
+        width, height = frame_size or (self.width, self.height)
+        text = " ".join((text or "").split())
+        digest = hashlib.sha1(f"{text}:{width}x{height}".encode("utf-8")).hexdigest()
+
+        if not output_path:
+            output_path = os.path.join(settings.IMAGES_DIR, f"card_{digest[:16]}.jpg")
+
+        top, bottom = self.palettes[int(digest[:8], 16) % len(self.palettes)]
+        tilt = (int(digest[8:10], 16) / 255.0 - 0.5) * 0.6
+        image = Image.fromarray(self._gradient(top, bottom, tilt, width, height), "RGB")
+
+        if text:
+            draw = ImageDraw.Draw(image)
+            font, lines, line_height = self._fit_text(draw, text, width, height)
+            shadow = max(2, line_height // 20)
+            y = (height - len(lines) * line_height) // 2
+
+            for line in lines:
+                x = (width - draw.textlength(line, font=font)) / 2
+                draw.text((x + shadow, y + shadow), line, font=font, fill=(0, 0, 0))
+                draw.text((x, y), line, font=font, fill=(255, 255, 255))
+                y += line_height
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        image.save(output_path, quality=92)
+
+        self.logger.info(f"Rendered title card to {output_path}")
+        return output_path
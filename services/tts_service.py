@@ -1,12 +1,38 @@
 import os
-from google.cloud import texttospeech
+import re
+import json
+import time
+import wave
+import hashlib
+import uuid
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape as xml_escape
+import numpy as np
+from google.cloud import texttospeech_v1beta1 as texttospeech  # v1beta1 adds SSML mark timepoints
 from google.oauth2 import service_account
 from config import settings
+from utils.ffmpeg import run_ffmpeg
 from utils.logger import Logger
 
+# Prosody attributes applied to the narration for each emotion
+EMOTION_SETTINGS = {
+    'happy': {'rate': '1.1', 'pitch': '+1.5st', 'volume': 'loud'},
+    'sad': {'rate': '0.9', 'pitch': '-2st', 'volume': 'soft'},
+    'excited': {'rate': '1.3', 'pitch': '+3st', 'volume': 'x-loud'},
+    'calm': {'rate': '0.8', 'pitch': '-0.5st', 'volume': 'medium'},
+    'angry': {'rate': '1.2', 'pitch': '-1st', 'volume': 'loud'},
+    'whisper': {'rate': '0.95', 'pitch': '-1st', 'volume': 'x-soft'},
+    'nervous': {'rate': '1.1', 'pitch': '+0.8st', 'volume': 'medium'}
+}
+
 class TTSService:
     def __init__(self):
         self.logger = Logger(__name__)
+        self.max_ssml_bytes = 5000  # Google TTS request limit
+        self.sample_rate = 24000
+        self.max_workers = settings.TTS_MAX_WORKERS
+        self.cache_dir = settings.TTS_CACHE_DIR
         
         try:
             # Load credentials explicitly from the JSON key file
@@ -38,56 +64,238 @@ class TTSService:
         Returns:
             str: Path to the generated audio file
         """
+        return self.synthesize_narration(script, emotion, voice_name, output_filename)["audio_path"]
+    
+    def synthesize_narration(self, script, emotion=None, voice_name="en-US-Wavenet-D", output_filename=None, audio_format=None):
+        """
+        Synthesise narration and report its exact duration and sentence/word timepoints
+        
+        Plain-text scripts are split at sentence boundaries and synthesised concurrently,
+        with each sentence cached by its SSML (text + prosody) and voice. Every word is
+        preceded by an SSML <mark> so the API returns its start time.
+        
+        Args:
+            script (str): The script text to convert to speech
+            emotion (str, optional): Emotion to apply (e.g., 'happy', 'sad', 'excited')
+            voice_name (str, optional): The voice to use for synthesis
+            output_filename (str, optional): Output file path. If None, a default path is generated.
+            audio_format (str, optional): "wav" (LINEAR16) or "mp3". Defaults to settings.TTS_AUDIO_FORMAT.
+            
+        Returns:
+            dict: audio_path, duration (seconds), sentences and words, each with start/end seconds
+        """
+        audio_format = (audio_format or settings.TTS_AUDIO_FORMAT).lower()
         if not output_filename:
-            # Generate a default filename based on timestamp
-            import time
-            timestamp = int(time.time())
-            output_filename = os.path.join(settings.AUDIO_DIR, f"audio_{timestamp}.mp3")
+            # Timestamped for sorting, with a random suffix so concurrent topics never share a file
+            output_filename = os.path.join(settings.AUDIO_DIR, f"audio_{int(time.time())}_{uuid.uuid4().hex[:8]}.{audio_format}")
         
-        self.logger.info(f"Generating audio from script ({len(script)} chars), emotion: {emotion}")
+        self.logger.info(f"Generating audio from script ({len(script)} chars), emotion: {emotion}, format: {audio_format}")
         
         try:
-            # Create synthesis input based on whether SSML is already included
-            if script.strip().startswith('<speak>'):
-                synthesis_input = texttospeech.SynthesisInput(ssml=script)
-            else:
-                # Apply emotion formatting if specified
-                if emotion:
-                    ssml_script = self._apply_emotion_to_ssml(script, emotion)
-                    synthesis_input = texttospeech.SynthesisInput(ssml=ssml_script)
-                else:
-                    synthesis_input = texttospeech.SynthesisInput(text=script)
-            
-            # Build the voice request
-            voice = texttospeech.VoiceSelectionParams(
-                language_code="en-US", 
-                name=voice_name
-            )
+            # Ensure directory exists
+            os.makedirs(os.path.dirname(output_filename), exist_ok=True)
             
-            # Select the type of audio file
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3
-            )
+            # Scripts that already contain SSML are sent as a single request, without timepoints
+            if script.strip().startswith('<speak>'):
+                duration = self._synthesize_single(script, voice_name, output_filename)
+                return {"audio_path": output_filename, "duration": duration, "sentences": [], "words": []}
             
-            # Perform the text-to-speech request
-            self.logger.info("Calling Google TTS API...")
-            response = self.client.synthesize_speech(
-                input=synthesis_input, voice=voice, audio_config=audio_config
-            )
+            # Build one SSML document per chunk, keeping the emotion prosody on each
+            chunks = self._split_into_chunks(script, emotion)
+            self.logger.info(f"Synthesising {len(chunks)} chunks with up to {self.max_workers} workers")
             
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(output_filename), exist_ok=True)
+            # Repeated sentences share one request (and one cache entry)
+            unique_ssml = list(dict.fromkeys(chunk["ssml"] for chunk in chunks))
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                synthesised = dict(zip(unique_ssml, executor.map(lambda ssml: self._synthesize_chunk(ssml, voice_name),
+                                                                 unique_ssml)))
+            results = [synthesised[chunk["ssml"]] for chunk in chunks]
             
-            # Write the audio content to file
-            with open(output_filename, "wb") as out:
-                out.write(response.audio_content)
+            samples = self._join_pcm([pcm for pcm, _ in results])
+            sentences, words = self._build_timepoints(chunks, results)
+            self._write_audio(samples, output_filename)
             
-            self.logger.info(f"Audio content written to {output_filename}")
-            return output_filename
+            duration = len(samples) / self.sample_rate
+            self.logger.info(f"Audio content written to {output_filename} ({duration:.2f}s)")
+            return {"audio_path": output_filename, "duration": duration, "sentences": sentences, "words": words}
             
         except Exception as e:
             self.logger.error(f"Error generating audio: {e}")
             raise
+    
+    def _synthesize_single(self, ssml, voice_name, output_filename):
+        """Synthesise a complete SSML document in one request, returning its duration if known"""
+        as_wav = output_filename.lower().endswith(".wav")
+        voice = texttospeech.VoiceSelectionParams(language_code="en-US", name=voice_name)
+        audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.LINEAR16 if as_wav else texttospeech.AudioEncoding.MP3
+        )
+        
+        self.logger.info("Calling Google TTS API...")
+        response = self.client.synthesize_speech(
+            input=texttospeech.SynthesisInput(ssml=ssml), voice=voice, audio_config=audio_config
+        )
+        
+        with open(output_filename, "wb") as out:
+            out.write(response.audio_content)
+        
+        if as_wav:
+            with wave.open(output_filename, "rb") as wav:
+                return wav.getnframes() / wav.getframerate()
+        return 0.0
+    
+    def _split_sentences(self, text):
+        """Split narration into sentences, keeping the closing punctuation"""
+        return [s.strip() for s in re.split(r'(?<=[.!?])\s+', text.strip()) if s.strip()]
+    
+    def _wrap_ssml(self, words, emotion):
+        """Wrap escaped words in SSML with a <mark> before each one, applying the emotion prosody if given"""
+        text = " ".join(f'<mark name="w{i}"/>{xml_escape(word)}' for i, word in enumerate(words))
+        if emotion:
+            return self._apply_emotion_to_ssml(text, emotion)
+        return f"<speak>{text}</speak>"
+    
+    def _split_into_chunks(self, script, emotion):
+        """
+        Build SSML chunks of one sentence each, splitting any sentence over the byte limit
+        
+        Args:
+            script (str): Plain narration text
+            emotion (str): Emotion to apply to every chunk
+            
+        Returns:
+            list: Dicts with the chunk's SSML, words and sentence index, each under the API's request size limit
+        """
+        chunks = []
+        for sentence_index, sentence in enumerate(self._split_sentences(script)):
+            words = sentence.split()
+            ssml = self._wrap_ssml(words, emotion)
+            if len(ssml.encode("utf-8")) <= self.max_ssml_bytes:
+                chunks.append({"ssml": ssml, "words": words, "sentence": sentence_index})
+                continue
+            
+            # Very long sentence: fall back to word boundaries
+            piece = []
+            for word in words:
+                if piece and len(self._wrap_ssml(piece + [word], emotion).encode("utf-8")) > self.max_ssml_bytes:
+                    chunks.append({"ssml": self._wrap_ssml(piece, emotion), "words": piece, "sentence": sentence_index})
+                    piece = []
+                piece.append(word)
+            if piece:
+                chunks.append({"ssml": self._wrap_ssml(piece, emotion), "words": piece, "sentence": sentence_index})
+        return chunks
+    
+    def _synthesize_chunk(self, ssml, voice_name):
+        """
+        Synthesise one SSML chunk to 16-bit PCM, reusing the on-disk cache when possible
+        
+        Args:
+            ssml (str): SSML document for the chunk
+            voice_name (str): The voice to use for synthesis
+            
+        Returns:
+            tuple: (raw mono PCM samples at self.sample_rate, {mark name: seconds})
+        """
+        key = hashlib.sha256(f"{voice_name}|{self.sample_rate}|{ssml}".encode("utf-8")).hexdigest()
+        cache_path = os.path.join(self.cache_dir, f"{key}.wav")
+        marks_path = os.path.join(self.cache_dir, f"{key}.json")
+        
+        if not (os.path.exists(cache_path) and os.path.exists(marks_path)):
+            request = texttospeech.SynthesizeSpeechRequest(
+                input=texttospeech.SynthesisInput(ssml=ssml),
+                voice=texttospeech.VoiceSelectionParams(language_code="en-US", name=voice_name),
+                audio_config=texttospeech.AudioConfig(
+                    audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+                    sample_rate_hertz=self.sample_rate
+                ),
+                enable_time_pointing=[texttospeech.SynthesizeSpeechRequest.TimepointType.SSML_MARK]
+            )
+            response = self.client.synthesize_speech(request=request)
+            marks = {tp.mark_name: tp.time_seconds for tp in response.timepoints}
+            
+            # Write atomically so concurrent runs never read a partial file
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for path, data in ((marks_path, json.dumps(marks).encode("utf-8")), (cache_path, response.audio_content)):
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                with os.fdopen(fd, "wb") as out:
+                    out.write(data)
+                os.replace(tmp_path, path)
+        else:
+            self.logger.debug(f"TTS cache hit: {key[:12]}")
+            with open(marks_path, "r") as f:
+                marks = json.load(f)
+        
+        with wave.open(cache_path, "rb") as wav:
+            return wav.readframes(wav.getnframes()), marks
+    
+    def _build_timepoints(self, chunks, results):
+        """
+        Convert per-chunk marks into absolute sentence and word timings
+        
+        Chunks are joined back to back, so each chunk's offset is the sample count before it.
+        
+        Returns:
+            tuple: (sentences, words) as lists of dicts with text/start/end in seconds
+        """
+        sentences = []
+        words = []
+        offset = 0.0
+        
+        for chunk, (pcm, marks) in zip(chunks, results):
+            chunk_duration = len(pcm) / 2 / self.sample_rate
+            starts = [marks.get(f"w{i}") for i in range(len(chunk["words"]))]
+            
+            for i, word in enumerate(chunk["words"]):
+                if starts[i] is None:
+                    continue
+                following = [t for t in starts[i + 1:] if t is not None]
+                end = following[0] if following else chunk_duration
+                words.append({"word": word, "start": round(offset + starts[i], 3), "end": round(offset + end, 3)})
+            
+            if sentences and sentences[-1]["index"] == chunk["sentence"]:
+                sentences[-1]["text"] += " " + " ".join(chunk["words"])
+                sentences[-1]["end"] = round(offset + chunk_duration, 3)
+            else:
+                sentences.append({
+                    "index": chunk["sentence"],
+                    "text": " ".join(chunk["words"]),
+                    "start": round(offset, 3),
+                    "end": round(offset + chunk_duration, 3)
+                })
+            offset += chunk_duration
+        
+        return sentences, words
+    
+    def _join_pcm(self, pcm_chunks):
+        """Concatenate PCM chunks, with a few milliseconds of fade at each edge to avoid clicks"""
+        fade_len = int(self.sample_rate * 0.005)
+        ramp = np.linspace(0.0, 1.0, fade_len, dtype=np.float32)
+        
+        pieces = []
+        for pcm in pcm_chunks:
+            samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+            if len(samples) > 2 * fade_len:
+                samples[:fade_len] *= ramp
+                samples[-fade_len:] *= ramp[::-1]
+            pieces.append(samples.astype(np.int16))
+        
+        return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.int16)
+    
+    def _write_audio(self, samples, output_filename):
+        """Write mono 16-bit samples as WAV, or encode to MP3 for .mp3 paths"""
+        wav_path = output_filename if output_filename.lower().endswith(".wav") else f"{output_filename}.wav"
+        
+        with wave.open(wav_path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(samples.tobytes())
+        
+        if wav_path != output_filename:
+            try:
+                run_ffmpeg(["-i", wav_path, "-codec:a", "libmp3lame", "-q:a", "2", output_filename])
+            finally:
+                os.remove(wav_path)
 
     def _apply_emotion_to_ssml(self, text, emotion):
         """
@@ -100,47 +308,8 @@ class TTSService:
         Returns:
             str: SSML formatted text with emotion applied
         """
-        # Define emotion settings based on prosody attributes
-        emotion_settings = {
-            'happy': {
-                'rate': '1.1', 
-                'pitch': '+1.5st', 
-                'volume': 'loud'
-            },
-            'sad': {
-                'rate': '0.9',
-                'pitch': '-2st',
-                'volume': 'soft'
-            },
-            'excited': {
-                'rate': '1.3',
-                'pitch': '+3st',
-                'volume': 'x-loud'
-            },
-            'calm': {
-                'rate': '0.8',
-                'pitch': '-0.5st',
-                'volume': 'medium'
-            },
-            'angry': {
-                'rate': '1.2',
-                'pitch': '-1st',
-                'volume': 'loud'
-            },
-            'whisper': {
-                'rate': '0.95',
-                'pitch': '-1st',
-                'volume': 'x-soft'
-            },
-            'nervous': {
-                'rate': '1.1',
-                'pitch': '+0.8st',
-                'volume': 'medium'
-            }
-        }
-        
         # Get settings for the requested emotion or use default
-        settings = emotion_settings.get(emotion.lower(), {})
+        settings = EMOTION_SETTINGS.get(emotion.lower(), {})
         
         # Create SSML with prosody tag
         if settings:
@@ -216,13 +385,4 @@ class TTSService:
     
     def _get_emotion_settings(self, emotion):
         """Get prosody settings for a specific emotion"""
-        emotion_settings = {
-            'happy': {'rate': '1.1', 'pitch': '+1.5st', 'volume': 'loud'},
-            'sad': {'rate': '0.9', 'pitch': '-2st', 'volume': 'soft'},
-            'excited': {'rate': '1.3', 'pitch': '+3st', 'volume': 'x-loud'},
-            'calm': {'rate': '0.8', 'pitch': '-0.5st', 'volume': 'medium'},
-            'angry': {'rate': '1.2', 'pitch': '-1st', 'volume': 'loud'},
-            'whisper': {'rate': '0.95', 'pitch': '-1st', 'volume': 'x-soft'},
-            'nervous': {'rate': '1.1', 'pitch': '+0.8st', 'volume': 'medium'}
-        }
-        return emotion_settings.get(emotion.lower(), {'rate': '1.0', 'pitch': '+0st', 'volume': 'medium'})
\ No newline at end of file
+        return EMOTION_SETTINGS.get(emotion.lower(), {'rate': '1.0', 'pitch': '+0st', 'volume': 'medium'})
\ No newline at end of file
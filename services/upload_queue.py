@@ -0,0 +1,299 @@
+#services/upload_queue.py
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from config import settings
+from services.youtube_uploader import YouTubeUploader
+from utils.logger import Logger
+
+class UploadQueue:
+    """
+    Durable SQLite queue of YouTube uploads drained by background worker threads
+
+    The workflow enqueues a finished video and moves on. Workers claim jobs one at a
+    time, up to settings.UPLOAD_WORKERS concurrently, and only while the day's YouTube
+    quota budget has room for another insert. Job status is written back to the queue
+    database, and a job's files are deleted only once YouTube has confirmed the upload.
+
+    Several processes can share the queue. A claimed job is leased to its owner, which
+    renews a heartbeat while the upload runs; only jobs whose owner stopped renewing
+    are taken back and resumed by another worker.
+    """
+
+    def __init__(self, db_path=None, uploader=None):
+        self.logger = Logger(__name__)
+        self.db_path = db_path or settings.UPLOAD_QUEUE_PATH
+        self.uploader = uploader or YouTubeUploader()
+        self.workers = settings.UPLOAD_WORKERS
+        self.daily_quota = settings.YOUTUBE_DAILY_QUOTA
+        self.insert_cost = settings.YOUTUBE_INSERT_QUOTA_COST
+        self.max_attempts = settings.UPLOAD_MAX_ATTEMPTS
+        self.poll_interval = 5.0
+        self.lease_seconds = settings.UPLOAD_LEASE_SECONDS
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._threads = []
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._quota_warned_day = None
+        self._create_tables()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection for the calling thread and close it afterwards"""
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            yield connection
+        finally:
+            connection.close()
+
+    def _create_tables(self):
+        """Create the job and quota tables if they don't exist"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS uploads (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    video_path TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    tags TEXT,
+                    cleanup_paths TEXT NOT NULL DEFAULT '[]',
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    progress REAL NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt REAL NOT NULL DEFAULT 0,
+                    video_id TEXT,
+                    video_url TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    heartbeat REAL NOT NULL DEFAULT 0,
+                    quota_day TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+            """)
+            # Queues created before leases were added
+            columns = {row["name"] for row in db.execute("PRAGMA table_info(uploads)")}
+            if "owner" not in columns:
+                db.execute("ALTER TABLE uploads ADD COLUMN owner TEXT")
+            if "heartbeat" not in columns:
+                db.execute("ALTER TABLE uploads ADD COLUMN heartbeat REAL NOT NULL DEFAULT 0")
+            if "quota_day" not in columns:
+                db.execute("ALTER TABLE uploads ADD COLUMN quota_day TEXT")
+            db.execute("CREATE TABLE IF NOT EXISTS quota_usage (day TEXT PRIMARY KEY, units INTEGER NOT NULL)")
+
+    @staticmethod
+    def _quota_day():
+        """YouTube quota resets at midnight Pacific time"""
+        return datetime.now(ZoneInfo("America/Los_Angeles")).strftime("%Y-%m-%d")
+
+    def enqueue(self, video_path, title, description, tags=None, cleanup_paths=None):
+        """
+        Add a video to the upload queue
+
+        Args:
+            video_path (str): Path to the video file
+            title (str): Video title
+            description (str): Video description
+            tags (list, optional): List of tags
+            cleanup_paths (list, optional): Files to delete once the upload is confirmed
+
+        Returns:
+            int: Job id
+        """
+        now = time.time()
+        with self._connect() as db:
+            cursor = db.execute(
+                "INSERT INTO uploads (video_path, title, description, tags, cleanup_paths, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_path, title, description, json.dumps(tags) if tags is not None else None,
+                 json.dumps(cleanup_paths or []), now, now)
+            )
+            job_id = cursor.lastrowid
+        self.logger.info(f"Queued upload {job_id}: {title}")
+        return job_id
+
+    def get(self, job_id):
+        """
+        Current state of an upload job
+
+        Args:
+            job_id (int): Job id from enqueue
+
+        Returns:
+            dict: Job row (status, progress, attempts, video_id, video_url, error, ...) or None
+        """
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM uploads WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _update(self, job_id, **fields):
+        """Write job fields back to the queue"""
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as db:
+            db.execute(f"UPDATE uploads SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _claim(self):
+        """Atomically take the next due job, reserving its quota; None when idle or out of budget"""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose owner stopped renewing its lease (crashed or killed) go back in the queue
+                now = time.time()
+                expired = db.execute(
+                    "UPDATE uploads SET status = 'queued', owner = NULL, updated = ? "
+                    "WHERE status = 'uploading' AND heartbeat < ?",
+                    (now, now - self.lease_seconds)
+                ).rowcount
+                if expired:
+                    self.logger.warning(f"Re-queued {expired} uploads whose worker stopped responding")
+
+                row = db.execute(
+                    "SELECT * FROM uploads WHERE status = 'queued' AND next_attempt <= ? ORDER BY id LIMIT 1",
+                    (time.time(),)
+                ).fetchone()
+                if row is None:
+                    db.execute("COMMIT")
+                    return None
+
+                # A job is charged for its insert once; retries resume the same upload session
+                quota_day = row["quota_day"]
+                if quota_day is None:
+                    quota_day = self._quota_day()
+                    used = db.execute("SELECT units FROM quota_usage WHERE day = ?", (quota_day,)).fetchone()
+                    used = used["units"] if used else 0
+                    if used + self.insert_cost > self.daily_quota:
+                        db.execute("COMMIT")
+                        if self._quota_warned_day != quota_day:
+                            self._quota_warned_day = quota_day
+                            self.logger.warning(f"YouTube quota budget used ({used}/{self.daily_quota} units), uploads wait until tomorrow")
+                        return None
+
+                    db.execute(
+                        "INSERT INTO quota_usage (day, units) VALUES (?, ?) "
+                        "ON CONFLICT(day) DO UPDATE SET units = units + excluded.units",
+                        (quota_day, self.insert_cost)
+                    )
+                db.execute(
+                    "UPDATE uploads SET status = 'uploading', attempts = attempts + 1, owner = ?, heartbeat = ?, "
+                    "quota_day = ?, updated = ? WHERE id = ?",
+                    (self.owner, now, quota_day, now, row["id"])
+                )
+                db.execute("COMMIT")
+                return dict(row, quota_day=quota_day)
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+
+    def _process(self, job):
+        """Upload one claimed job and record the outcome"""
+        job_id = job["id"]
+        tags = json.loads(job["tags"]) if job["tags"] else None
+        progress = lambda fraction: self._update(job_id, progress=fraction)
+
+        try:
+            result = self.uploader.upload_video(job["video_path"], job["title"], job["description"], tags,
+                                                progress_callback=progress)
+        except Exception as e:
+            result = {"error": str(e), "insert_issued": True}  # Unknown, so keep the units charged
+
+        if "error" not in result:
+            self._update(job_id, status="done", progress=1.0, video_id=result["video_id"],
+                         video_url=result["video_url"], error=None)
+            self.logger.info(f"Upload {job_id} confirmed: {result['video_url']}")
+            self._cleanup_files(json.loads(job["cleanup_paths"]))
+            return
+
+        if not result.get("insert_issued", True):
+            self._refund(job_id, job["quota_day"])
+
+        attempts = job["attempts"] + 1
+        if attempts >= self.max_attempts:
+            self._update(job_id, status="failed", error=result["error"])
+            self.logger.error(f"Upload {job_id} failed after {attempts} attempts: {result['error']}")
+        else:
+            # Back off before retrying; the resumable session lets the retry continue mid-file
+            delay = min(60 * 2 ** (attempts - 1), 3600)
+            self._update(job_id, status="queued", owner=None, error=result["error"], next_attempt=time.time() + delay)
+            self.logger.warning(f"Upload {job_id} attempt {attempts} failed, retrying in {delay}s: {result['error']}")
+
+    def _refund(self, job_id, quota_day):
+        """Give back a job's insert units when its attempt failed before YouTube received an insert"""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("UPDATE quota_usage SET units = MAX(units - ?, 0) WHERE day = ?",
+                           (self.insert_cost, quota_day))
+                db.execute("UPDATE uploads SET quota_day = NULL WHERE id = ?", (job_id,))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        self.logger.info(f"Upload {job_id} issued no insert, refunded {self.insert_cost} quota units")
+
+    def _cleanup_files(self, paths):
+        """Delete a job's local files after its upload is confirmed"""
+        for path in paths:
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                    self.logger.info(f"Deleted file: {path}")
+                except Exception as e:
+                    self.logger.warning(f"Failed to delete file {path}: {e}")
+
+    def _heartbeat(self):
+        """Renew the lease on this queue's in-flight jobs until stopped"""
+        while not self._stop.wait(self.lease_seconds / 4):
+            try:
+                with self._connect() as db:
+                    db.execute("UPDATE uploads SET heartbeat = ? WHERE owner = ? AND status = 'uploading'",
+                               (time.time(), self.owner))
+            except Exception as e:
+                self.logger.error(f"Error renewing upload leases: {e}")
+
+    def _worker(self):
+        """Drain the queue until stopped"""
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except Exception as e:
+                self.logger.error(f"Error reading upload queue: {e}")
+                job = None
+
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self._process(job)
+
+    def start(self):
+        """Start the background workers (idempotent)"""
+        with self._start_lock:
+            if self._threads:
+                return
+            # Jobs left mid-upload by a process that has died are re-queued by _claim once their lease expires
+
+            self._stop.clear()
+            targets = [(self._heartbeat, "upload-heartbeat")]
+            targets += [(self._worker, f"upload-worker-{index}") for index in range(self.workers)]
+            for target, name in targets:
+                thread = threading.Thread(target=target, name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            self.logger.info(f"Started {self.workers} upload workers")
+
+    def stop(self, timeout=None):
+        """Ask the workers to finish their current upload and exit"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
@@ -1,18 +1,39 @@
 import os
-import time
+import copy
 import random
+import time
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from moviepy.editor import (
-    AudioFileClip, ImageClip, concatenate_videoclips, CompositeAudioClip,
+    AudioFileClip, ImageClip, VideoClip, concatenate_videoclips, CompositeAudioClip,
     vfx, transfx
 )
+from moviepy.audio.AudioClip import AudioArrayClip
 from config import settings
+from services.motion_renderer import MotionRenderer, choose_effect
+from services.audio_mixer import AudioMixer
+from services.caption_renderer import CaptionRenderer
+from services.bumper_cache import BumperCache
+from services.ffmpeg_renderer import FFmpegRenderer
+from services.segment_renderer import SegmentRenderer
+from services.frame_writer import FrameStreamWriter
+from utils.ffmpeg import get_render_profile, video_encoder_args, audio_encoder_args, video_track_timescale
 from utils.logger import Logger
 
 class VideoEditor:
     def __init__(self):
         self.logger = Logger(__name__)
+        self.ffmpeg_renderer = FFmpegRenderer()
+        self.segment_renderer = SegmentRenderer()
+        self.audio_mixer = AudioMixer()
+        self.bumpers = BumperCache()
+        self._render_executor = ThreadPoolExecutor(max_workers=1)  # Deferred final renders, one at a time
+        self._pending_renders = {}  # Output path -> Future of a deferred render
     
-    def create_video(self, audio_path, image_paths, bg_music_path):
+    def create_video(self, audio_path, image_paths, bg_music_path, audio_duration=None, sentence_timepoints=None,
+                     word_timepoints=None, profile=None, seed=None):
         """
         Create a video from audio and images
         
@@ -20,89 +41,479 @@ class VideoEditor:
             audio_path (str): Path to the audio file
             image_paths (list): List of paths to image files
             bg_music_path (str, optional): Path to background music file
+            audio_duration (float, optional): Exact narration duration reported by TTS
+            sentence_timepoints (list, optional): Sentence start/end times used to place image cuts
+            word_timepoints (list, optional): Word start/end times, burned in as captions
+            profile (str, optional): Render profile name; defaults to settings.RENDER_PROFILE
+            seed (int, optional): Seed for the per-segment effects; random if omitted
             
         Returns:
             str: Path to the generated video file
         """
+        self.logger.info(f"Creating video from {len(image_paths)} images and audio")
+        
+        try:
+            timeline = self.build_timeline(audio_path, image_paths, bg_music_path, audio_duration, sentence_timepoints,
+                                           word_timepoints, profile, seed)
+            return self.render_timeline(timeline, self.output_path(timeline))
+            
+        except Exception as e:
+            self.logger.error(f"Error creating video: {e}")
+            raise
+    
+    def build_timeline(self, audio_path, image_paths, bg_music_path, audio_duration=None, sentence_timepoints=None,
+                       word_timepoints=None, profile=None, seed=None):
+        """
+        Describe the video as plain data that any render backend can draw
+        
+        Args:
+            audio_path (str): Path to the narration audio file
+            image_paths (list): List of paths to image files
+            bg_music_path (str, optional): Path to background music file
+            audio_duration (float, optional): Exact narration duration reported by TTS
+            sentence_timepoints (list, optional): Sentence start/end times used to place image cuts
+            word_timepoints (list, optional): Word start/end times, burned in as captions
+            profile (str, optional): Render profile name; defaults to settings.RENDER_PROFILE
+            seed (int, optional): Seed for the per-segment effects; random if omitted
+            
+        Returns:
+            dict: Audio inputs, render profile, output geometry and one segment (image, start, duration, effect) per image
+        """
+        profile = get_render_profile(profile)
+        fps = profile["fps"]
+        seed = seed if seed is not None else random.randint(1, 2**31 - 1)
+        
         if not bg_music_path or not os.path.exists(bg_music_path):
             self.logger.info("Using default background music")
             bg_music_path = settings.BG_MUSIC_PATH
+        if not os.path.exists(bg_music_path):
+            self.logger.info("No background music added")
+            bg_music_path = ""
         
-        self.logger.info(f"Creating video from {len(image_paths)} images and audio")
+        audio_duration = audio_duration or self._narration_duration(audio_path)
+        
+        # Calculate duration for each image, cutting on sentence boundaries when known
+        segment_durations = self._segment_durations(audio_duration, len(image_paths), fps, sentence_timepoints)
+        self.logger.info(f"Audio duration: {audio_duration:.2f}s, Durations per image: {[round(d, 2) for d in segment_durations]}")
+        
+        segments = []
+        start = 0.0
+        for i, (img_path, duration) in enumerate(zip(image_paths, segment_durations)):
+            # Each segment's slideshow effect depends only on the seed and its position
+            effect = choose_effect(random.Random(f"{seed}:{i}"))
+            segments.append({"image_path": img_path, "start": start, "duration": duration, "effect": effect})
+            start += duration
+        
+        return {
+            "audio_path": audio_path,
+            "bg_music_path": bg_music_path,
+            "bg_volume": 0.05,
+            "duration": audio_duration,
+            "seed": seed,
+            "intro_path": settings.INTRO_BUMPER_PATH if os.path.exists(settings.INTRO_BUMPER_PATH) else "",
+            "outro_path": settings.OUTRO_BUMPER_PATH if os.path.exists(settings.OUTRO_BUMPER_PATH) else "",
+            "words": word_timepoints if settings.CAPTIONS_ENABLED and word_timepoints else [],
+            "profile": profile,
+            "renditions": [name for name in settings.RENDITIONS if name != profile["name"]],
+            "fps": fps,
+            "frame_size": list(profile["frame_size"]),
+            "segments": segments
+        }
+    
+    def output_path(self, timeline):
+        """Generate a unique output filename for a timeline"""
+        run_id = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"  # Concurrent topics must never share a name
+        return os.path.join(settings.VIDEOS_DIR, f"video_{run_id}_{timeline['profile']['name']}.mp4")
+    
+    def preview_timeline(self, timeline, profile=None):
+        """
+        Derive a low-resolution copy of a timeline for review
+        
+        Only the render profile and output geometry change; images, cut points and
+        effect parameters are shared, so the preview shows exactly what the final render will.
+        
+        Args:
+            timeline (dict): Timeline from build_timeline
+            profile (str, optional): Render profile name; defaults to settings.PREVIEW_RENDER_PROFILE
+            
+        Returns:
+            dict: Preview timeline
+        """
+        profile = get_render_profile(profile or settings.PREVIEW_RENDER_PROFILE)
+        preview = copy.deepcopy(timeline)
+        preview["profile"] = profile
+        preview["fps"] = profile["fps"]
+        preview["frame_size"] = list(profile["frame_size"])
+        preview["renditions"] = []
+        return preview
+    
+    def rendition_paths(self, timeline, output_path):
+        """
+        Output path of every extra rendition of a timeline
         
+        Args:
+            timeline (dict): Timeline from build_timeline
+            output_path (str): Path of the main video
+            
+        Returns:
+            dict: Render profile name -> video path, including the main video
+        """
+        base = os.path.splitext(output_path)[0]
+        paths = {timeline["profile"]["name"]: output_path}
+        for name in timeline.get("renditions", []):
+            paths[name] = f"{base}_{name}.mp4"
+        return paths
+    
+    def _rendition_specs(self, timeline, output_path):
+        """
+        Encoder settings and output path of each extra rendition
+        
+        The encoder arguments come from video_encoder_args, so every rendition carries the
+        shared track timescale and its profile's bumpers can be joined by stream copy.
+        """
+        specs = []
+        for name, path in self.rendition_paths(timeline, output_path).items():
+            if name == timeline["profile"]["name"]:
+                continue
+            profile = get_render_profile(name)
+            specs.append({
+                "profile": profile,
+                "path": path,
+                "frame_size": list(profile["frame_size"]),
+                "fps": profile["fps"],
+                "encoder_args": video_encoder_args(profile),
+                "audio_args": audio_encoder_args(profile),
+            })
+        return specs
+    
+    def start_render(self, timeline, output_path):
+        """
+        Render a timeline in the background
+        
+        Args:
+            timeline (dict): Timeline from build_timeline
+            output_path (str): Path of the video to write
+            
+        Returns:
+            Future: Resolves to output_path once the video is written
+        """
+        future = self._pending_renders.get(output_path)
+        if future is None:
+            self.logger.info(f"Scheduling background render of {output_path}")
+            future = self._render_executor.submit(self.render_timeline, timeline, output_path)
+            self._pending_renders[output_path] = future
+        return future
+    
+    def finish_render(self, timeline, output_path):
+        """
+        Wait for a deferred render, starting it now if it was never scheduled
+        
+        Args:
+            timeline (dict): Timeline the video is rendered from
+            output_path (str): Path of the video to write
+            
+        Returns:
+            str: Path to the generated video file
+        """
+        future = self._pending_renders.get(output_path)
+        if future is None and os.path.exists(output_path):
+            # Renders are moved into place only once complete, so an existing file is a finished one
+            return output_path
+        
+        future = future or self.start_render(timeline, output_path)
         try:
-            # Generate output filename
-            timestamp = int(time.time())
-            output_path = os.path.join(settings.VIDEOS_DIR, f"video_{timestamp}.mp4")
-            
-            # Load audio clip
-            audio_clip = AudioFileClip(audio_path)
-            audio_duration = audio_clip.duration
-            
-            # Calculate duration for each image (evenly distributed)
-            image_count = len(image_paths)
-            duration_per_image = audio_duration / image_count
-            
-            self.logger.info(f"Audio duration: {audio_duration:.2f}s, Duration per image: {duration_per_image:.2f}s")
-            
-            # Create video clips from images with slideshow effects
-            video_clips = []
-            for img_path in image_paths:
-                # Apply a random slideshow effect to each image
-                img_clip = self._create_animated_clip(img_path, duration_per_image)
-                video_clips.append(img_clip)
-            
-            # Concatenate video clips
-            final_clip = concatenate_videoclips(video_clips, method="compose")
-            
-            # Add audio (narration and background music)
-            if os.path.exists(bg_music_path):
-                self.logger.info(f"Adding background music from {bg_music_path}")
-                bg_music = AudioFileClip(bg_music_path).volumex(0.05)  # Set volume to 20%
-                
-                # Loop the background music if needed
-                if bg_music.duration < audio_duration:
-                    bg_music = bg_music.audio_loop(duration=audio_duration)
-                else:
-                    bg_music = bg_music.subclip(0, audio_duration)
-                
-                # Combine audio tracks
-                final_audio = CompositeAudioClip([audio_clip, bg_music])
-                final_clip = final_clip.set_audio(final_audio)
+            return future.result()
+        finally:
+            self._pending_renders.pop(output_path, None)
+    
+    def discard_render(self, timeline, output_path):
+        """
+        Drop a deferred render whose timeline is out of date, deleting anything it wrote
+        
+        Args:
+            timeline (dict): Timeline the render was started with
+            output_path (str): Path of the video it was writing
+        """
+        future = self._pending_renders.pop(output_path, None)
+        if future is not None and not future.cancel():
+            self.logger.info(f"Waiting for the outdated render of {output_path} to stop")
+            try:
+                future.result()
+            except Exception as e:
+                self.logger.warning(f"Outdated render of {output_path} failed: {e}")
+        
+        for path in self.rendition_paths(timeline, output_path).values():
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def render_timeline(self, timeline, output_path, backend=None):
+        """
+        Render a timeline with the configured backend
+        
+        Args:
+            timeline (dict): Timeline from build_timeline
+            output_path (str): Path of the video to write
+            backend (str, optional): "moviepy", "ffmpeg", "segments" or "stream"; defaults to settings.VIDEO_RENDER_BACKEND
+            
+        Returns:
+            str: Path to the generated video file
+        """
+        backend = backend or settings.VIDEO_RENDER_BACKEND
+        self.logger.info(f"Writing video to {output_path} ({backend} backend)")
+        
+        # Outputs are written under a temporary name and moved into place once complete, so an
+        # interrupted render never leaves a file that looks finished
+        base, extension = os.path.splitext(output_path)
+        work_path = f"{base}.partial{extension}"
+        moves = list(zip(self.rendition_paths(timeline, work_path).values(),
+                         self.rendition_paths(timeline, output_path).values()))
+        renditions = self._rendition_specs(timeline, work_path)
+        
+        # Every backend encodes the same pre-mixed soundtrack
+        mix_path = os.path.join(settings.TEMP_DIR, f"mix_{os.path.splitext(os.path.basename(output_path))[0]}.wav")
+        try:
+            mixed = dict(timeline, audio_path=self.audio_mixer.mix(timeline, mix_path), bg_music_path="")
+            
+            # Every backend encodes its renditions from the composed frames, never from the lossy main output
+            if backend == "ffmpeg":
+                if timeline.get("words"):
+                    self.logger.warning("Captions are not drawn by the ffmpeg backend")
+                self.ffmpeg_renderer.render(mixed, work_path, renditions=renditions)
+            elif backend == "segments":
+                self.segment_renderer.render(mixed, work_path, renditions)
+            elif backend == "stream":
+                self._render_stream(mixed, work_path, renditions)
             else:
-                self.logger.info("No background music added")
-                final_clip = final_clip.set_audio(audio_clip)
+                self._render_moviepy(mixed, work_path, renditions)
+            
+            # Branding is joined by stream copy from bumpers pre-encoded for each profile
+            if timeline.get("intro_path") or timeline.get("outro_path"):
+                outputs = [(work_path, timeline["profile"])] + [(r["path"], r["profile"]) for r in renditions]
+                for path, profile in outputs:
+                    self.bumpers.attach(path, profile, timeline.get("intro_path"), timeline.get("outro_path"))
+            
+            # The main video goes last: its presence means every rendition is in place too
+            for path, destination in reversed(moves):
+                os.replace(path, destination)
+        finally:
+            for path in [mix_path] + [path for path, _ in moves]:
+                if os.path.exists(path):
+                    os.remove(path)
+        
+        self.logger.info(f"Video created successfully: {output_path}")
+        return output_path
+    
+    def _render_moviepy(self, timeline, output_path, renditions=None):
+        """Render a timeline by compositing clips in MoviePy; with renditions, its frames feed one split encoder"""
+        audio_duration = timeline["duration"]
+        profile = timeline["profile"]
+        fps = timeline["fps"]
+        frame_size = tuple(timeline["frame_size"])
+        
+        # Load audio clip (PCM narration is read directly, skipping the ffmpeg decode)
+        audio_clip = self._load_narration(timeline["audio_path"])
+        
+        # Create video clips from images with slideshow effects
+        video_clips = []
+        for segment in timeline["segments"]:
+            img_clip = self._create_animated_clip(segment["image_path"], segment["duration"], segment["effect"], fps, frame_size)
+            video_clips.append(img_clip)
+        
+        # Concatenate video clips
+        if settings.VIDEO_MOTION_RENDERER == "moviepy":
+            final_clip = self._fit_to_frame(concatenate_videoclips(video_clips, method="compose"), frame_size)
+        else:
+            final_clip = concatenate_videoclips(video_clips, method="chain")
+        
+        if timeline.get("words"):
+            captions = CaptionRenderer(timeline["words"], frame_size)
+            final_clip = final_clip.fl(lambda get_frame, t: captions.apply(np.array(get_frame(t)), t))
+        
+        # Add audio (narration and background music)
+        bg_music = None
+        if timeline["bg_music_path"]:
+            self.logger.info(f"Adding background music from {timeline['bg_music_path']}")
+            bg_music = AudioFileClip(timeline["bg_music_path"]).volumex(timeline["bg_volume"])
+            
+            # Loop the background music if needed
+            if bg_music.duration < audio_duration:
+                bg_music = bg_music.audio_loop(duration=audio_duration)
+            else:
+                bg_music = bg_music.subclip(0, audio_duration)
+            
+            # Combine audio tracks
+            final_audio = CompositeAudioClip([audio_clip, bg_music])
+            final_clip = final_clip.set_audio(final_audio)
+        else:
+            final_clip = final_clip.set_audio(audio_clip)
+        
+        if renditions:
+            # write_videofile has one output, so pipe the composed frames to a writer that splits them
+            with FrameStreamWriter(output_path, frame_size, fps, video_encoder_args(profile), timeline["audio_path"],
+                                   audio_args=audio_encoder_args(profile), renditions=renditions) as writer:
+                for frame in final_clip.iter_frames(fps=fps, dtype="uint8"):
+                    buffer = writer.acquire()
+                    buffer[...] = frame
+                    writer.submit(buffer)
+        else:
+            # Write the result to a file with the profile's encoder settings
+            ffmpeg_params = ["-pix_fmt", "yuv420p", "-video_track_timescale", str(video_track_timescale(profile))]
+            if not profile.get("video_bitrate"):
+                ffmpeg_params += ["-crf", str(profile["crf"])]
+            if profile.get("tune"):
+                ffmpeg_params += ["-tune", profile["tune"]]
             
-            # Write the result to a file
-            self.logger.info(f"Writing video to {output_path}")
             final_clip.write_videofile(
                 output_path, 
                 codec='libx264', 
                 audio_codec='aac', 
-                fps=24,
+                fps=fps,
+                preset=profile["preset"],
+                bitrate=profile.get("video_bitrate"),
+                audio_bitrate=profile["audio_bitrate"],
+                threads=profile.get("threads") or None,
+                ffmpeg_params=ffmpeg_params,
                 logger=None  # Disable moviepy's logger
             )
+        
+        # Close clips to free memory
+        final_clip.close()
+        audio_clip.close()
+        if bg_music:
+            bg_music.close()
+    
+    def _render_stream(self, timeline, output_path, renditions=None):
+        """
+        Render a timeline by streaming frames straight into one ffmpeg encoder
+        
+        Only one segment's scaled source image and the writer's ring of frame buffers are
+        held in memory, so peak memory does not grow with video length or image count.
+        Extra renditions are scaled and encoded from the same frames by the same ffmpeg.
+        """
+        fps = timeline["fps"]
+        frame_size = tuple(timeline["frame_size"])
+        captions = CaptionRenderer(timeline["words"], frame_size) if timeline.get("words") else None
+        frame_number = 0
+        encoder_args = video_encoder_args(timeline["profile"])
+        
+        # The timeline's audio is the pre-mixed WAV, encoded to AAC by the writer like the MoviePy backend does
+        with FrameStreamWriter(output_path, frame_size, fps, encoder_args, timeline["audio_path"],
+                               audio_args=audio_encoder_args(timeline["profile"]), renditions=renditions) as writer:
+            for segment in timeline["segments"]:
+                renderer = MotionRenderer(segment["image_path"], segment["effect"], segment["duration"], fps, frame_size)
+                for index in range(renderer.frame_count):
+                    frame = renderer.render_frame(index, out=writer.acquire())
+                    if captions:
+                        captions.apply(frame, frame_number / fps)
+                    writer.submit(frame)
+                    frame_number += 1
+                del renderer
+    
+    def _narration_duration(self, audio_path):
+        """Duration of the narration, read from the WAV header when possible"""
+        if audio_path.lower().endswith(".wav"):
+            with wave.open(audio_path, "rb") as wav:
+                return wav.getnframes() / wav.getframerate()
+        
+        audio_clip = AudioFileClip(audio_path)
+        duration = audio_clip.duration
+        audio_clip.close()
+        return duration
+    
+    def _load_narration(self, audio_path):
+        """Load narration audio, reading WAV samples straight into memory instead of decoding through ffmpeg"""
+        if not audio_path.lower().endswith(".wav"):
+            return AudioFileClip(audio_path)
+        
+        with wave.open(audio_path, "rb") as wav:
+            fps = wav.getframerate()
+            channels = wav.getnchannels()
+            pcm = wav.readframes(wav.getnframes())
+        
+        samples = np.frombuffer(pcm, dtype=np.int16).reshape(-1, channels).astype(np.float32) / 32768.0
+        if channels == 1:
+            samples = np.repeat(samples, 2, axis=1)  # Match the stereo music bed
+        return AudioArrayClip(samples, fps=fps)
+    
+    def _segment_durations(self, audio_duration, image_count, fps, sentence_timepoints=None):
+        """
+        Split the narration into one segment per image
+        
+        Cuts start evenly spaced and are moved to the nearest sentence boundary when one
+        is close enough, so images change with the narration rather than mid-sentence.
+        
+        Args:
+            audio_duration (float): Total narration duration in seconds
+            image_count (int): Number of images
+            fps (int): Frames per second of the render
+            sentence_timepoints (list, optional): Dicts with sentence start/end seconds
             
-            # Close clips to free memory
-            final_clip.close()
-            audio_clip.close()
-            if os.path.exists(bg_music_path):
-                bg_music.close()
-            
-            self.logger.info(f"Video created successfully: {output_path}")
-            return output_path
-            
-        except Exception as e:
-            self.logger.error(f"Error creating video: {e}")
-            raise
+        Returns:
+            list: Duration of each segment in seconds, summing to audio_duration
+        """
+        even = audio_duration / image_count
+        boundaries = sorted(s["start"] for s in (sentence_timepoints or []) if 0 < s["start"] < audio_duration)
+        
+        cuts = [0.0]
+        for k in range(1, image_count):
+            ideal = k * even
+            cut = ideal
+            if boundaries:
+                nearest = min(boundaries, key=lambda b: abs(b - ideal))
+                # Only snap when the segment before the cut stays at least half the even length.
+                # The segment after does too: the cut moves at most half an even length towards
+                # the next ideal cut, and that cut only snaps if it keeps this check in turn.
+                if abs(nearest - ideal) <= even / 2 and nearest - cuts[-1] >= even / 2:
+                    cut = nearest
+            cuts.append(max(cut, cuts[-1]))
+        cuts.append(audio_duration)
+        
+        # Align cuts to the frame grid so every segment renders a whole number of frames
+        cuts = [round(c * fps) / fps for c in cuts[:-1]] + [audio_duration]
+        
+        return [end - start for start, end in zip(cuts, cuts[1:])]
+    
+    def _fit_to_frame(self, clip, frame_size):
+        """Centre-crop a clip to the frame's aspect ratio and scale it to the frame size"""
+        width, height = clip.size
+        crop_width = min(width, height * frame_size[0] / frame_size[1])
+        crop_height = crop_width * frame_size[1] / frame_size[0]
+        clip = clip.fx(vfx.crop, x_center=width / 2, y_center=height / 2, width=crop_width, height=crop_height)
+        return clip.resize(newsize=frame_size)
     
-    def _create_animated_clip(self, img_path, duration):
+    def _create_animated_clip(self, img_path, duration, effect=None, fps=24, frame_size=(1080, 1920)):
         """
         Create an animated clip from a single image with zoom and pan effects
         
         Args:
             img_path (str): Path to the image file
             duration (float): Duration of the clip in seconds
+            effect (dict, optional): Motion parameters from choose_effect; random if omitted
+            fps (int, optional): Frames per second of the render
+            frame_size (tuple, optional): (width, height) of the output frame
+            
+        Returns:
+            VideoClip: Animated image clip
+        """
+        effect = effect or choose_effect()
+        
+        if settings.VIDEO_MOTION_RENDERER == "moviepy":
+            return self._create_moviepy_clip(img_path, duration, effect)
+        
+        renderer = MotionRenderer(img_path, effect, duration, fps, frame_size)
+        return VideoClip(make_frame=renderer.make_frame, duration=duration)
+    
+    def _create_moviepy_clip(self, img_path, duration, effect):
+        """
+        Create an animated clip with per-frame MoviePy resize/position lambdas
+        
+        This is the original effect implementation, kept as a fallback and as the
+        baseline for benchmarking MotionRenderer.
+        
+        Args:
+            img_path (str): Path to the image file
+            duration (float): Duration of the clip in seconds
+            effect (dict): Motion parameters from choose_effect
             
         Returns:
             ImageClip: Animated image clip
@@ -111,33 +522,32 @@ class VideoEditor:
         img_clip = ImageClip(img_path)
         img_clip = img_clip.resize(width=1920)
         
-        # Choose a random effect for the image
-        effect_type = random.choice(['zoom', 'pan', 'zoom_out', 'pan_zoom'])
+        effect_type = effect["type"]
         
         if effect_type == 'zoom':
             # Gradual zoom in effect
-            zoom_factor = random.uniform(1.05, 1.2)
+            zoom_factor = effect["zoom_end"]
             img_clip = img_clip.resize(lambda t: 1 + (zoom_factor - 1) * t / duration)
             img_clip = img_clip.set_position(('center', 'center')).set_duration(duration)
             
         elif effect_type == 'zoom_out':
             # Zoom out effect
-            zoom_factor = random.uniform(1.1, 1.3)
+            zoom_factor = effect["zoom_start"]
             img_clip = img_clip.resize(lambda t: zoom_factor - (zoom_factor - 1) * t / duration)
             img_clip = img_clip.set_position(('center', 'center')).set_duration(duration)
             
         elif effect_type == 'pan':
             # Pan effect (left to right, right to left, top to bottom, or bottom to top)
-            direction = random.choice(['left_to_right', 'right_to_left', 'top_to_bottom', 'bottom_to_top'])
+            (start_x, start_y), (end_x, end_y) = effect["pan_start"], effect["pan_end"]
             
             # Resize image slightly larger for better panning effect
             img_clip = img_clip.resize(width=2200)
             
-            if direction == 'left_to_right':
+            if end_x > start_x:
                 position_func = lambda t: ('left' if t == 0 else 'right' if t == duration else -200 + 400 * t / duration, 'center')
-            elif direction == 'right_to_left':
+            elif end_x < start_x:
                 position_func = lambda t: ('right' if t == 0 else 'left' if t == duration else 200 - 400 * t / duration, 'center')
-            elif direction == 'top_to_bottom':
+            elif end_y > start_y:
                 position_func = lambda t: ('center', 'top' if t == 0 else 'bottom' if t == duration else -100 + 200 * t / duration)
             else:  # bottom_to_top
                 position_func = lambda t: ('center', 'bottom' if t == 0 else 'top' if t == duration else 100 - 200 * t / duration)
@@ -146,9 +556,9 @@ class VideoEditor:
             
         else:  # pan_zoom combination
             # Combine zoom and pan for more dynamic effect
-            zoom_factor = random.uniform(1.05, 1.15)
-            position_x = random.choice([-100, 100])
-            position_y = random.choice([-50, 50])
+            zoom_factor = effect["zoom_end"]
+            position_x = 100 if effect["pan_end"][0] > 0 else -100
+            position_y = 50 if effect["pan_end"][1] > 0 else -50
             
             img_clip = img_clip.resize(lambda t: 1 + (zoom_factor - 1) * t / duration)
             img_clip = img_clip.set_position(
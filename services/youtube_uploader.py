@@ -1,9 +1,13 @@
 # services/youtube_uploader.py
 import os
+import json
+import time
 import pickle
+import hashlib
+import threading
 import google.oauth2.credentials
 import google_auth_oauthlib.flow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
 from googleapiclient.http import MediaFileUpload
 from googleapiclient.errors import HttpError
 from google.auth.transport.requests import Request
@@ -11,13 +15,44 @@ from config import settings
 from utils.logger import Logger
 
 class YouTubeUploader:
-    def __init__(self):
+    def __init__(self, credentials=None):
         self.logger = Logger(__name__)
         self.client_secrets_file = settings.YOUTUBE_CLIENT_SECRETS_PATH
         self.token_pickle_file = settings.YOUTUBE_TOKEN_PICKLE_PATH
+        self.discovery_path = settings.YOUTUBE_DISCOVERY_PATH
+        self.api_endpoint = settings.YOUTUBE_API_ENDPOINT
+        # Credentials and service clients live as long as the uploader
+        self._credentials = credentials
+        self._credentials_lock = threading.Lock()
+        self._local = threading.local()  # One service per thread: its HTTP transport is not thread-safe
+        self.session_dir = settings.UPLOAD_SESSION_DIR
+        self.chunk_size = settings.YOUTUBE_UPLOAD_CHUNK_MB * 1024 * 1024  # A multiple of 256 KiB, as the API requires
+        self.max_retries = settings.YOUTUBE_UPLOAD_MAX_RETRIES  # Per chunk; the client library retries 5xx and network errors
     
     def get_credentials(self):
-        """Get OAuth credentials for YouTube API"""
+        """Get OAuth credentials for YouTube API, reusing the cached ones until they expire"""
+        with self._credentials_lock:
+            credentials = self._credentials
+            if credentials is not None and credentials.valid:
+                return credentials
+            
+            if credentials is not None and credentials.expired and getattr(credentials, "refresh_token", None):
+                self.logger.info("Refreshing access token...")
+                credentials.refresh(Request())
+                self._save_credentials(credentials)
+                return credentials
+            
+            self._credentials = self._load_credentials()
+            return self._credentials
+    
+    def _save_credentials(self, credentials):
+        """Save credentials for next run"""
+        self.logger.info(f"Saving credentials to {self.token_pickle_file}")
+        with open(self.token_pickle_file, 'wb') as token:
+            pickle.dump(credentials, token)
+    
+    def _load_credentials(self):
+        """Load stored OAuth credentials, refreshing or re-authorising when needed"""
         credentials = None
         
         # Check if we have stored credentials
@@ -38,14 +73,133 @@ class YouTubeUploader:
                 )
                 credentials = flow.run_local_server(port=8080)
             
-            # Save credentials for next run
-            self.logger.info(f"Saving credentials to {self.token_pickle_file}")
-            with open(self.token_pickle_file, 'wb') as token:
-                pickle.dump(credentials, token)
+            self._save_credentials(credentials)
         
         return credentials
     
-    def upload_video(self, video_path, title, description, tags=None):
+    def get_service(self):
+        """
+        YouTube API client for the calling thread, built once from a local discovery document
+        
+        Returns:
+            Resource: YouTube Data API v3 service
+        """
+        credentials = self.get_credentials()
+        service = getattr(self._local, "service", None)
+        if service is not None and getattr(self._local, "credentials", None) is credentials:
+            return service
+        
+        client_options = {"api_endpoint": self.api_endpoint} if self.api_endpoint else None
+        if self.discovery_path:
+            with open(self.discovery_path, "r") as f:
+                service = build_from_document(f.read(), credentials=credentials, client_options=client_options)
+        else:
+            # The discovery document bundled with google-api-python-client, no network fetch
+            service = build("youtube", "v3", credentials=credentials, client_options=client_options,
+                            static_discovery=True, cache_discovery=False)
+        
+        self._local.service = service
+        self._local.credentials = credentials
+        return service
+    
+    def _session_path(self, video_path):
+        """File holding the resumable upload session of a video, keyed by its identity on disk"""
+        stat = os.stat(video_path)
+        key = hashlib.sha256(f"{os.path.abspath(video_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8")).hexdigest()
+        return os.path.join(self.session_dir, f"{key}.json")
+    
+    def _load_session(self, video_path):
+        """Resumable session URI saved by an earlier, interrupted upload of this video"""
+        session_path = self._session_path(video_path)
+        if not os.path.exists(session_path):
+            return None
+        try:
+            with open(session_path, "r") as f:
+                return json.load(f).get("resumable_uri")
+        except Exception as e:
+            self.logger.warning(f"Could not read upload session {session_path}: {e}")
+            return None
+    
+    def _save_session(self, video_path, resumable_uri, progress):
+        """Persist the resumable session URI and uploaded offset so a restarted worker can continue"""
+        session_path = self._session_path(video_path)
+        temp_path = f"{session_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"video_path": video_path, "resumable_uri": resumable_uri, "progress": progress,
+                       "updated": time.time()}, f)
+        os.replace(temp_path, session_path)
+    
+    def _clear_session(self, video_path):
+        """Forget a finished or expired upload session"""
+        session_path = self._session_path(video_path)
+        if os.path.exists(session_path):
+            os.remove(session_path)
+    
+    def _resume_session(self, upload_request, resumable_uri, video_path):
+        """
+        Ask YouTube how much of a saved session it has and point the request at that offset
+        
+        Args:
+            upload_request (HttpRequest): videos().insert request with a resumable media body
+            resumable_uri (str): Session URI saved by an earlier upload of this video
+            video_path (str): Path to the video file
+            
+        Returns:
+            dict: API response if the earlier upload had already completed, otherwise None
+        """
+        size = os.path.getsize(video_path)
+        resp, content = upload_request.http.request(
+            resumable_uri, "PUT", headers={"Content-Length": "0", "Content-Range": f"bytes */{size}"}
+        )
+        if resp.status in (200, 201):
+            return json.loads(content)
+        if resp.status == 308:
+            # Range is "bytes=0-<last byte received>", absent when nothing arrived
+            received = resp.get("range")
+            upload_request.resumable_uri = resumable_uri
+            upload_request.resumable_progress = int(received.rsplit("-", 1)[1]) + 1 if received else 0
+            self.logger.info(f"Resuming interrupted upload at byte {upload_request.resumable_progress} of {size}")
+            return None
+        if resp.status in (404, 410):
+            # The saved session expired on YouTube's side: start a new one from byte zero
+            self.logger.warning("Upload session expired, restarting upload")
+            self._clear_session(video_path)
+            return None
+        raise HttpError(resp, content, uri=resumable_uri)
+    
+    def _resumable_upload(self, upload_request, video_path, progress_callback=None):
+        """
+        Send the video chunk by chunk, continuing a session saved by an interrupted upload
+        
+        Args:
+            upload_request (HttpRequest): videos().insert request with a resumable media body
+            video_path (str): Path to the video file, used to key the saved session
+            progress_callback (callable, optional): Called with the uploaded fraction (0..1) after each chunk
+            
+        Returns:
+            dict: API response for the created video
+        """
+        response = None
+        resumable_uri = self._load_session(video_path)
+        if resumable_uri:
+            response = self._resume_session(upload_request, resumable_uri, video_path)
+        
+        while response is None:
+            # Failed chunks are retried with backoff by the client library, which asks the
+            # server for its offset before resending; errors that outlast the retries end this attempt
+            status, response = upload_request.next_chunk(num_retries=self.max_retries)
+            
+            if response is None and upload_request.resumable_uri:
+                self._save_session(video_path, upload_request.resumable_uri, upload_request.resumable_progress)
+            if status:
+                self.logger.info(f"Uploaded {int(status.progress() * 100)}%")
+                if progress_callback:
+                    progress_callback(status.progress())
+        
+        self._clear_session(video_path)
+        return response
+    
+    def upload_video(self, video_path, title, description, tags=None, progress_callback=None):
         """
         Upload video to YouTube
         
@@ -54,20 +208,22 @@ class YouTubeUploader:
             title (str): Video title
             description (str): Video description
             tags (list, optional): List of tags
+            progress_callback (callable, optional): Called with the uploaded fraction (0..1) after each chunk
             
         Returns:
-            dict: Upload response containing video ID and URL
+            dict: Upload response containing video ID and URL, or the error and whether
+                an insert reached YouTube (and so cost quota) before it failed
         """
         self.logger.info(f"Uploading video: {title}")
         
         if not os.path.exists(video_path):
             self.logger.error(f"Video file not found: {video_path}")
-            return {"error": "Video file not found"}
+            return {"error": "Video file not found", "insert_issued": False}
         
+        insert_issued = False
         try:
-            # Get credentials and build service
-            credentials = self.get_credentials()
-            youtube = build("youtube", "v3", credentials=credentials)
+            # Reuse the long-lived service client
+            youtube = self.get_service()
             
             # Set tags if provided
             if tags is None:
@@ -85,8 +241,8 @@ class YouTubeUploader:
                 }
             }
             
-            # Create media file upload object
-            media = MediaFileUpload(video_path, chunksize=-1, resumable=True)
+            # Create media file upload object, sent in chunks so a failure only resends one chunk
+            media = MediaFileUpload(video_path, chunksize=self.chunk_size, resumable=True)
             
             # Execute upload
             self.logger.info("Starting video upload to YouTube...")
@@ -96,7 +252,8 @@ class YouTubeUploader:
                 media_body=media
             )
             
-            response = upload_request.execute()
+            insert_issued = True
+            response = self._resumable_upload(upload_request, video_path, progress_callback)
             video_id = response['id']
             video_url = f"https://www.youtube.com/shorts/{video_id}"
             
@@ -109,7 +266,7 @@ class YouTubeUploader:
             
         except HttpError as e:
             self.logger.error(f"YouTube HTTP error: {e.resp.status} {e.content}")
-            return {"error": f"YouTube HTTP error: {e.resp.status}"}
+            return {"error": f"YouTube HTTP error: {e.resp.status}", "insert_issued": insert_issued}
         except Exception as e:
             self.logger.error(f"Error uploading video: {e}")
-            return {"error": str(e)}
\ No newline at end of file
+            return {"error": str(e), "insert_issued": insert_issued}
\ No newline at end of file
@@ -0,0 +1,89 @@
+# utils/blob_store.py
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from config import settings
+
+class BlobStore:
+    """
+    Content-addressed store for large workflow payloads
+
+    Values are serialised to JSON and written once under the sha256 of their bytes,
+    so the workflow state only carries a short reference and identical payloads share
+    one file. Recently read values are kept in memory.
+    """
+
+    def __init__(self, root=None, cache_size=64):
+        self.root = root or settings.BLOB_STORE_DIR
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # Reference -> value, least recently used first
+        self._lock = threading.Lock()
+
+    def _path(self, ref):
+        """File holding a blob, fanned out by the first two hex digits"""
+        return os.path.join(self.root, ref[:2], f"{ref}.json")
+
+    def _remember(self, ref, value):
+        with self._lock:
+            self._cache[ref] = value
+            self._cache.move_to_end(ref)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def put(self, value):
+        """
+        Store a JSON-serialisable value
+
+        Args:
+            value: String, list or dict to store
+
+        Returns:
+            str: Reference to the value, or "" for an empty value
+        """
+        if not value:
+            return ""
+
+        data = json.dumps(value, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+
+        self._remember(ref, value)
+        return ref
+
+    def exists(self, ref):
+        """Whether a non-empty reference still has its file (an empty one always exists)"""
+        return not ref or os.path.exists(self._path(ref))
+
+    def get(self, ref, default=None):
+        """
+        Load a stored value
+
+        Args:
+            ref (str): Reference returned by put
+            default: Value returned for an empty reference
+
+        Returns:
+            The stored value
+        """
+        if not ref:
+            return default
+
+        with self._lock:
+            if ref in self._cache:
+                self._cache.move_to_end(ref)
+                return self._cache[ref]
+
+        with open(self._path(ref), "r", encoding="utf-8") as f:
+            value = json.load(f)
+        self._remember(ref, value)
+        return value
+
+blob_store = BlobStore()
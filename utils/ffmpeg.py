@@ -0,0 +1,125 @@
+# utils/ffmpeg.py
+import re
+import subprocess
+from config import settings
+
+def get_ffmpeg_binary():
+    """Locate the ffmpeg binary MoviePy is configured with, falling back to the one on PATH"""
+    try:
+        from moviepy.config import get_setting
+        return get_setting("FFMPEG_BINARY")
+    except Exception:
+        return "ffmpeg"
+
+def run_ffmpeg(args, input_bytes=None):
+    """
+    Run ffmpeg with the given arguments and raise if it fails
+
+    Args:
+        args (list): Arguments passed after the binary and the common flags
+        input_bytes (bytes, optional): Data written to ffmpeg's stdin
+
+    Returns:
+        bytes: ffmpeg's stdout
+    """
+    command = [get_ffmpeg_binary(), "-y", "-hide_banner", "-loglevel", "error", *args]
+    result = subprocess.run(command, input=input_bytes, capture_output=True)
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"ffmpeg exited with code {result.returncode}: {stderr}")
+    return result.stdout
+
+def has_audio_stream(path):
+    """Check whether a media file contains an audio stream"""
+    result = subprocess.run([get_ffmpeg_binary(), "-hide_banner", "-i", path], capture_output=True)
+    return b"Audio:" in result.stderr
+
+def video_frame_times(path):
+    """
+    Presentation times of a file's video frames, read from its packets without decoding
+
+    Args:
+        path (str): Path to the media file
+
+    Returns:
+        list: Frame times in seconds, in presentation order
+    """
+    output = run_ffmpeg(["-i", path, "-map", "0:v:0", "-c", "copy", "-f", "framemd5", "-"]).decode("utf-8")
+    numerator, denominator = re.search(r"#tb 0: (\d+)/(\d+)", output).groups()
+    time_base = int(numerator) / int(denominator)
+    # Packet lines: stream, dts, pts, duration, size, hash
+    return sorted(int(line.split(",")[2]) * time_base for line in output.splitlines()
+                  if line and not line.startswith("#"))
+
+def video_track_timescale(profile):
+    """
+    MP4 video track timescale for a render profile
+
+    Every file that may be joined by stream copy (segments, bumpers, full renders and
+    renditions) must share it; left to the muxer it varies by backend (12288 at 24 fps).
+    """
+    return profile["fps"] * 1000
+
+def get_render_profile(name=None):
+    """
+    Look up a render profile from settings.RENDER_PROFILES
+
+    Args:
+        name (str, optional): Profile name; defaults to settings.RENDER_PROFILE
+
+    Returns:
+        dict: Copy of the profile with its name under "name"
+    """
+    name = name or settings.RENDER_PROFILE
+    if name not in settings.RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile '{name}', expected one of {sorted(settings.RENDER_PROFILES)}")
+    profile = dict(settings.RENDER_PROFILES[name])
+    profile["name"] = name
+    return profile
+
+def video_encoder_args(profile, threads=None):
+    """
+    libx264 arguments for a render profile
+
+    Args:
+        profile (dict): Render profile from get_render_profile
+        threads (int, optional): Encoder thread count overriding the profile's
+
+    Returns:
+        list: ffmpeg output arguments for the video stream
+    """
+    args = ["-c:v", "libx264", "-preset", profile["preset"], "-pix_fmt", "yuv420p", "-r", str(profile["fps"])]
+    if profile.get("video_bitrate"):
+        # Capped target bitrate with a one-second rate-control buffer
+        bitrate = profile["video_bitrate"]
+        args += ["-b:v", bitrate, "-maxrate", bitrate, "-bufsize", bitrate]
+    else:
+        args += ["-crf", str(profile["crf"])]
+    if profile.get("tune"):
+        args += ["-tune", profile["tune"]]
+    args += ["-threads", str(profile.get("threads", 0) if threads is None else threads)]
+    # Fixed timescale so outputs of any backend can be concatenated without re-encoding
+    args += ["-video_track_timescale", str(video_track_timescale(profile))]
+    return args
+
+def audio_encoder_args(profile):
+    """AAC arguments for a render profile"""
+    return ["-c:a", "aac", "-b:a", profile["audio_bitrate"]]
+
+def rendition_graph(source, renditions):
+    """
+    Filter graph that splits one video stream into a scaled copy per rendition
+
+    Args:
+        source (str): Label of the input video stream, e.g. "0:v"
+        renditions (list): Dicts with the frame_size and fps of each output
+
+    Returns:
+        tuple: (filter_complex string, output label of each rendition)
+    """
+    labels = [f"r{i}" for i in range(len(renditions))]
+    chains = [f"[{source}]split={len(renditions)}" + "".join(f"[{label}in]" for label in labels)]
+    for label, rendition in zip(labels, renditions):
+        width, height = rendition["frame_size"]
+        chains.append(f"[{label}in]scale={width}:{height}:flags=bicubic,fps={rendition['fps']},setsar=1[{label}]")
+    return ";".join(chains), labels
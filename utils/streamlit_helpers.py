@@ -22,6 +22,12 @@ def initialize_session_state():
     
     if 'selected_trending_topic' not in st.session_state:
         st.session_state.selected_trending_topic = ""
+    
+    if 'thread_id' not in st.session_state:
+        st.session_state.thread_id = ""
+    
+    if 'review_edits' not in st.session_state:
+        st.session_state.review_edits = {}
 
 def validate_api_keys():
     """Validate required API keys and credentials"""
@@ -93,9 +99,9 @@ def display_news_review(consolidated_news):
     # Add edit functionality
     edited_news = st.text_area("Edit News (if needed)", consolidated_news, height=300)
     
-    # Update session state if edited
+    # Record the edit; it is passed to the workflow when it resumes
     if edited_news != consolidated_news:
-        st.session_state.workflow_state.consolidated_news = edited_news
+        st.session_state.review_edits["consolidated_news"] = edited_news
         st.success("News content updated.")
 
 def display_script_review(script, image_prompts):
@@ -106,9 +112,9 @@ def display_script_review(script, image_prompts):
         st.write("Review the generated script:")
         edited_script = st.text_area("Script", script, height=400)
         
-        # Update session state if edited
+        # Record the edit; it is passed to the workflow when it resumes
         if edited_script != script:
-            st.session_state.workflow_state.script = edited_script
+            st.session_state.review_edits["script"] = edited_script
             st.success("Script updated.")
     
     with tab2:  
@@ -119,9 +125,9 @@ def display_script_review(script, image_prompts):
             edited_prompt = st.text_input(f"Image {i+1}", prompt)
             edited_prompts.append(edited_prompt)
         
-        # Update session state if any prompts were edited
+        # Record the edit if any prompts were changed
         if edited_prompts != image_prompts:
-            st.session_state.workflow_state.image_prompts = edited_prompts
+            st.session_state.review_edits["image_prompts"] = edited_prompts
             st.success("Image prompts updated.")
 
 def display_media_review(audio_path, image_paths):
@@ -138,7 +144,7 @@ def display_media_review(audio_path, image_paths):
                 "Download Audio",
                 data=open(audio_path, "rb").read(),
                 file_name=os.path.basename(audio_path),
-                mime="audio/mp3"
+                mime="audio/wav" if audio_path.lower().endswith(".wav") else "audio/mp3"
             )
         else:
             st.warning("Audio file not found or not generated yet.")